@@ -1,24 +1,79 @@
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import re
-import feedparser
 import time
 import random
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from fake_useragent import UserAgent
 import json
+import calendar
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import XMLParsedAsHTMLWarning
 import warnings
+from politeness import BATCH_HOST_BURST, BATCH_HOST_RATE, HostRateLimiter
+from revalidation import default_store as default_revalidation_store
+from http_client import get_session
+from single_flight import SingleFlightCache
+from browser_pool import DriverPool
+from feed_reader import read_feed
+from circuit_breaker import BreakerRegistry
+from batch_fetch import DEFAULT_PER_HOST, fetch_batch
+from article_cache import default_article_cache
+from article_preview import extract_news_preview, extract_news_previews, is_table_of_contents
+from timeline import merge_timeline, normalize_items
+from near_duplicates import collapse_near_duplicates
+from url_canon import url_key
+from news_item import NewsItem
+from html_parsing import HTML_BACKEND, make_soup, make_tree, text_lines, tree_from_html
+from site_extraction import SelectorMemo
+from site_specs import SITE_SPECS, SITES
+import atexit
+
+# selenium, feedparser и fake_useragent тяжёлые: импортируются при первом использовании,
+# чтобы импорт модуля (и старт каждого воркера gunicorn) не ждал их загрузки
+
+# User-Agent сессии по умолчанию; запросы парсера передают свой, случайный из fake_useragent
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
 
 # Подавляем предупреждение о парсинге XML как HTML
 warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
 
+# Профили браузера для Selenium:
+# full   - обычный Chrome, грузит всё как пользователь;
+# scrape - нам нужен только DOM: картинки, шрифты, CSS и медиа блокируются,
+#          страница считается загруженной по DOMContentLoaded (eager), длина HTML ограничена
+BROWSER_PROFILES = {
+    'full': {
+        'page_load_strategy': 'normal',
+        'blocked_urls': [],
+        'max_page_chars': None,
+    },
+    'scrape': {
+        'page_load_strategy': 'eager',
+        'blocked_urls': [
+            '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+            '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+            '*.css',
+            '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+        ],
+        'max_page_chars': 3 * 1024 * 1024,
+    },
+}
+DEFAULT_BROWSER_PROFILE = 'scrape'
+
+# Сколько записей RSS нужно и сколько секунд максимум читаем одну ленту
+RSS_ENTRY_LIMIT = 20
+RSS_DEADLINE = 20
+
+# Больше новостей с одного источника категория не показывает: страницу-список
+# дальше этого числа не дочитываем (размер куска - как у лент)
+LISTING_ITEM_LIMIT = 25
+LISTING_CHUNK_SIZE = 16 * 1024
+
 # URL для РИА Новостей
 URL_POLITICS = "https://ria.ru/politics/"
 URL_SCIENCE = "https://ria.ru/science/"
@@ -29,353 +84,459 @@ class AdvancedNewsParser:
     Усовершенствованный парсер новостей с оптимизированными источниками
     """
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.ua = UserAgent()
+    # Селекторы списков новостей по источникам (описания источников - в site_specs).
+    # По ним же Selenium понимает, что страница готова
+    RIA_ITEM_SELECTORS = SITE_SPECS['RIA.ru']['items']
+    TASS_ITEM_SELECTORS = SITE_SPECS['TASS']['items']
+    INTERFAX_ITEM_SELECTORS = SITE_SPECS['Интерфакс']['items']
+    DOCTORPITER_ITEM_SELECTORS = SITE_SPECS['Доктор Питер']['items']
+    GENERIC_ITEM_SELECTORS = SITE_SPECS['generic']['items']
+    
+    # Селекторы основного текста статьи
+    ARTICLE_CONTENT_SELECTORS = [
+        'div.article__body',
+        'div.article-text',
+        'div.b-text',
+        'article',
+        'div.content',
+        'div.post-content',
+        '[class*="article"]',
+        '[class*="content"]'
+    ]
+    RIA_ARTICLE_CONTENT_SELECTORS = [
+        'div.article__body',
+        'div.article__text',
+        'article',
+        '.content',
+        '.post-content',
+        '[class*="article"]',
+        '[class*="content"]'
+    ]
+    
+    # Служебные блоки внутри текста статьи
+    UNWANTED_ARTICLE_SELECTOR = ', '.join([
+        'script', 'style', '.ad', '.banner', '.social', '.share',
+        '.article__info', '.article__meta', '.article__tags',
+        '.recommended', '.related', '.comments', '.advertisement'
+    ])
+    
+    def __init__(self, parallel: bool = False, max_workers: int = 5,
+                 max_browsers: int = 2, max_pages_per_browser: int = 50,
+                 browser_profile: str = DEFAULT_BROWSER_PROFILE):
+        # Общий с парсерами спорта/IT/образования пул соединений
+        self.session = get_session()
+        self._ua = None
         self.setup_session()
-        self.selenium_driver = None
         
+        # Прогретые браузеры переживают смену категорий и пересоздаются после N страниц
+        self.browser_profile = browser_profile
+        self.driver_pool = DriverPool(
+            lambda: self.get_selenium_driver(self.browser_profile),
+            max_drivers=max_browsers,
+            max_pages_per_driver=max_pages_per_browser
+        )
+        
+        # Параллельный режим: источники категории качаются одновременно,
+        # а вежливость обеспечивается token bucket'ом на каждый хост
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.host_limiter = HostRateLimiter()
+        # Пакеты статей: параллельность к хосту ограничивает per_host, темп - свой, более частый bucket
+        self.batch_host_limiter = HostRateLimiter(BATCH_HOST_RATE, BATCH_HOST_BURST)
+        self._local = threading.local()
+        
+        # Условные запросы: ETag / Last-Modified и прошлые результаты по URL
+        self.revalidator = default_revalidation_store
+        
+        # Извлечённые тексты статей и превью: повторные запросы не качают и не разбирают страницу
+        self.article_cache = default_article_cache
+        
+        # Ленты, общие для нескольких категорий (ТАСС, Интерфакс), качаются один раз за цикл;
+        # цикл начинает shared_feeds.start_cycle() - его вызывает NewsRefresher перед каждым проходом
+        self.shared_feeds = SingleFlightCache()
+        
+        # Предохранители по (источник, уровень каскада): мёртвые источники пропускаются дёшево
+        self.breakers = BreakerRegistry()
+        
+        # Память о том, какой уровень каскада и какой селектор сработали для источника в прошлый раз
+        self._tier_memo = {}
+        self._selector_memo = {}
+        self._memo_counters = {'tier_hits': 0, 'tier_misses': 0, 'selector_hits': 0, 'selector_misses': 0}
+        self._listing_memo = SelectorMemo(self._selector_memo, self._count_memo)
+        
+    @property
+    def ua(self):
+        """UserAgent создаётся при первом запросе, а не при создании парсера"""
+        if self._ua is None:
+            from fake_useragent import UserAgent
+            self._ua = UserAgent()
+        return self._ua
+    
     def setup_session(self):
-        """Настройка сессии с рандомными User-Agent"""
+        """Настройка сессии; случайный User-Agent передаётся в каждом запросе (см. _request_headers)"""
         self.session.headers.update({
-            'User-Agent': self.ua.random,
+            'User-Agent': DEFAULT_USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
     
-    def get_selenium_driver(self):
-        """Инициализация Selenium драйвера"""
-        if not self.selenium_driver:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument(f"user-agent={self.ua.random}")
-            chrome_options.add_argument("--window-size=1920,1080")
-            
-            self.selenium_driver = webdriver.Chrome(options=chrome_options)
-            self.selenium_driver.set_page_load_timeout(30)
-        
-        return self.selenium_driver
+    def _request_headers(self) -> Dict[str, str]:
+        """
+        Заголовки одного запроса со случайным User-Agent.
+        Сессия общая для всех парсеров и потоков, поэтому её заголовки не меняем
+        """
+        return {'User-Agent': self.ua.random}
+    
+    def get_selenium_driver(self, profile: str = 'full'):
+        """Создание нового Selenium драйвера с профилем из BROWSER_PROFILES (используется пулом driver_pool)"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        settings = BROWSER_PROFILES[profile]
+        
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument(f"user-agent={self.ua.random}")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.page_load_strategy = settings['page_load_strategy']
+        
+        if settings['blocked_urls']:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.managed_default_content_settings.fonts": 2,
+            })
+        
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(30)
+        
+        if settings['blocked_urls']:
+            # Картинки по prefs не блокируют CSS и шрифты - режем их на сетевом уровне через CDP
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': settings['blocked_urls']})
+        
+        return driver
+    
+    def _read_page_source(self, driver) -> str:
+        """HTML страницы; в профиле scrape - не больше max_page_chars символов"""
+        max_page_chars = BROWSER_PROFILES[self.browser_profile]['max_page_chars']
+        if max_page_chars:
+            # Останавливаем догрузку (реклама, счётчики) - DOM со списком уже есть
+            driver.execute_script('window.stop();')
+        html = driver.page_source
+        if max_page_chars and len(html) > max_page_chars:
+            print(f"✂️ Страница обрезана до {max_page_chars} символов")
+            html = html[:max_page_chars]
+        return html
     
     def close_selenium(self):
-        """Закрытие Selenium драйвера"""
-        if self.selenium_driver:
-            self.selenium_driver.quit()
-            self.selenium_driver = None
+        """Закрытие всех свободных Selenium драйверов пула"""
+        self.driver_pool.close()
     
-    def _make_request(self, url: str, use_selenium: bool = False) -> Optional[BeautifulSoup]:
+    def _wait_until_ready(self, driver, ready_selectors: Optional[List[str]], timeout: float = 10):
         """
-        Улучшенный запрос с поддержкой Selenium для динамического контента
+        Ждёт появления списка новостей (любого из селекторов) вместо фиксированной паузы.
+        Если селекторы не появились за timeout - берём то, что успело загрузиться.
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        if not ready_selectors:
+            ready_selectors = ['body']
+        
+        def page_ready(d):
+            return any(d.find_elements(By.CSS_SELECTOR, selector) for selector in ready_selectors)
+        
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.25).until(page_ready)
+            return True
+        except TimeoutException:
+            print(f"⏱️ Селекторы не появились за {timeout} с, берём текущий DOM")
+            return False
+    
+    def _make_request(self, url: str, use_selenium: bool = False,
+                      ready_selectors: Optional[List[str]] = None) -> Optional[BeautifulSoup]:
+        """
+        Улучшенный запрос с поддержкой Selenium для динамического контента.
+        ready_selectors - CSS селекторы, появление которых означает, что нужный контент отрисован
         """
         try:
             if use_selenium:
-                print(f"🔄 Используем Selenium для: {url}")
-                driver = self.get_selenium_driver()
-                driver.get(url)
-                
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                
-                time.sleep(3)
-                html = driver.page_source
-                return BeautifulSoup(html, 'html.parser')
+                return BeautifulSoup(self._render_page(url, ready_selectors), HTML_BACKEND)
             else:
                 print(f"🌐 Стандартный запрос: {url}")
-                time.sleep(random.uniform(1, 3))
-                self.session.headers['User-Agent'] = self.ua.random
-                
-                response = self.session.get(url, timeout=15)
-                response.encoding = 'utf-8'
-                print(f"✅ Статус: {response.status_code}")
+                self._wait_politeness(url)
                 
-                # Определяем, XML это или HTML
-                if any(xml_indicator in url.lower() for xml_indicator in ['rss', 'xml', 'feed', 'export']):
-                    print("📄 Используем XML парсер для RSS")
-                    return BeautifulSoup(response.content, 'xml')
-                else:
-                    return BeautifulSoup(response.text, 'html.parser')
+                response = self.session.get(url, headers=self._request_headers())
+                return self._soup_from_response(url, response)
                     
         except Exception as e:
             print(f"❌ Ошибка запроса {url}: {e}")
             return None
 
-    def parse_with_fallback_strategy(self, url: str, source_type: str) -> List[Dict]:
+    def _render_page(self, url: str, ready_selectors: Optional[List[str]] = None) -> str:
+        """HTML страницы после отрисовки в браузере из пула"""
+        print(f"🔄 Используем Selenium для: {url}")
+        with self.driver_pool.driver() as driver:
+            driver.get(url)
+            self._wait_until_ready(driver, ready_selectors)
+            return self._read_page_source(driver)
+    
+    def _soup_from_response(self, url: str, response: requests.Response) -> BeautifulSoup:
+        print(f"✅ Статус: {response.status_code}")
+        # XML или HTML определяется по Content-Type, а не по подстрокам в URL
+        return make_soup(response, url)
+    
+    def _fetch_revalidated(self, url: str, extract, key=None, tree: bool = False, stream: bool = False,
+                           cache_variant: Optional[str] = None):
         """
-        Многоуровневая стратегия парсинга с приоритетом для РИА Новостей
+        Статический запрос с условной ревалидацией.
+        Возвращает extract(soup), при ответе 304 - прошлый результат без парсинга, при ошибке - None.
+        key отличает результаты разных способов разбора одного URL,
+        tree=True - extract получает дерево lxml.html вместо BeautifulSoup (страницы-списки),
+        stream=True - extract получает сам ответ с непрочитанным телом и читает его сколько нужно,
+        cache_variant - результат сохраняется в кэше статей и не извлекается заново из того же тела
         """
-        print(f"🎯 Запускаем каскадный парсинг для: {url}")
-        
+        print(f"🌐 Условный запрос: {url}")
+        try:
+            self._wait_politeness(url)
+            headers = self._request_headers()
+            if stream:
+                return self.revalidator.fetch(
+                    url, extract, get=self.session.get, key=key, headers=headers, stream=True
+                )
+            parse = lambda response: extract(
+                make_tree(response) if tree else self._soup_from_response(url, response)
+            )
+            if cache_variant:
+                parse = self.article_cache.extractor(url, cache_variant, parse)
+            return self.revalidator.fetch(url, parse, get=self.session.get, key=key, headers=headers)
+        except Exception as e:
+            print(f"❌ Ошибка запроса {url}: {e}")
+            return None
+    
+    def _wait_politeness(self, url: str):
+        """Пауза перед запросом: случайная в обычном режиме, по хосту - в параллельном и пакетном"""
+        limiter = getattr(self._local, 'host_limiter', None)
+        if limiter is not None:
+            limiter.acquire(url)
+        else:
+            time.sleep(random.uniform(1, 3))
+
+    def _cascade_tiers(self, url: str) -> List[str]:
+        """Уровни каскада для источника в порядке приоритета"""
         # Для РИА Новостей используем специализированный парсер
         if 'ria.ru' in url and not ('rss' in url or 'export' in url):
-            print("🔍 Используем специализированный парсер для РИА Новостей")
-            return self._parse_ria_news_advanced(url, source_type)
-        
-        # Приоритет 1: Парсинг RSS
+            return ['ria']
         if any(rss_indicator in url.lower() for rss_indicator in ['rss', 'export', 'feed']):
-            news = self._parse_rss_feed_advanced(url)
-            if news:
-                print(f"✅ RSS успешно: {len(news)} новостей")
-                return news
+            return ['rss', 'static', 'selenium']
+        return ['static', 'selenium']
+    
+    def _run_tier(self, url: str, tier: str, source_type: str) -> Optional[List[Dict]]:
+        """
+        Один уровень каскада под предохранителем (url, tier).
+        Возвращает None, если уровень пропущен: предохранитель открыт после серии неудач.
+        """
+        breaker = self.breakers.get((url, tier))
+        if not breaker.allow():
+            retry_in = breaker.snapshot()['retry_in']
+            print(f"⏭️ Пропускаем {tier} для {url}: предохранитель открыт, повтор через {retry_in} с")
+            return None
         
-        # Приоритет 2: Статический HTML парсинг
-        soup_static = self._make_request(url, use_selenium=False)
-        if soup_static:
-            news = self._extract_news_advanced(soup_static, url, source_type)
+        news = []
+        try:
+            if tier == 'ria':
+                print("🔍 Используем специализированный парсер для РИА Новостей")
+                news = self._parse_ria_news_advanced(url, source_type)
+            elif tier == 'rss':
+                # Приоритет 1: Парсинг RSS
+                news = self._parse_rss_feed_advanced(url)
+            elif tier == 'static':
+                # Приоритет 2: Статический HTML парсинг (с условным запросом)
+                news = self._fetch_listing(url, key=(url, 'static'))
+            elif tier == 'selenium':
+                # Приоритет 3: Динамический парсинг через Selenium
+                print("🔄 Переходим к динамическому парсингу...")
+                try:
+                    html = self._render_page(url, self._listing_selectors(url))
+                    news = self._extract_listing(tree_from_html(html), url)
+                except Exception as e:
+                    print(f"❌ Ошибка запроса {url}: {e}")
+            news = news or []
+        finally:
             if news:
-                print(f"✅ Статический парсинг успешен: {len(news)} новостей")
-                return news
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        return news
+    
+    def parse_with_fallback_strategy(self, url: str, source_type: str) -> List[Dict]:
+        """
+        Многоуровневая стратегия парсинга с приоритетом для РИА Новостей.
+        Уровни, которые раз за разом не дают результата, временно пропускаются
+        """
+        print(f"🎯 Запускаем каскадный парсинг для: {url}")
         
-        # Приоритет 3: Динамический парсинг через Selenium
-        print("🔄 Переходим к динамическому парсингу...")
-        soup_dynamic = self._make_request(url, use_selenium=True)
-        if soup_dynamic:
-            news = self._extract_news_advanced(soup_dynamic, url, source_type)
+        tier_names = {'ria': 'РИА', 'rss': 'RSS', 'static': 'Статический парсинг', 'selenium': 'Динамический парсинг'}
+        remembered = self._tier_memo.get(url)
+        for tier in self._remembered_first(remembered, self._cascade_tiers(url)):
+            news = self._run_tier(url, tier, source_type)
             if news:
-                print(f"✅ Динамический парсинг успешен: {len(news)} новостей")
+                print(f"✅ {tier_names[tier]} успешно: {len(news)} новостей")
+                self._count_memo('tier', remembered == tier)
+                self._tier_memo[url] = tier
                 return news
         
+        if remembered:
+            self._count_memo('tier', False)
+        
         print("❌ Все методы парсинга не дали результатов")
         return []
+    
+    # ===== ЗАПОМИНАНИЕ РАБОТАЮЩИХ УРОВНЕЙ И СЕЛЕКТОРОВ =====
+    
+    @staticmethod
+    def _remembered_first(remembered, options: List) -> List:
+        """Сначала то, что сработало в прошлый раз, затем остальные варианты в исходном порядке"""
+        if remembered is None or remembered not in options:
+            return options
+        return [remembered] + [option for option in options if option != remembered]
+    
+    def _count_memo(self, kind: str, hit: bool):
+        self._memo_counters[f"{kind}_{'hits' if hit else 'misses'}"] += 1
+    
+    def memo_stats(self) -> Dict[str, int]:
+        stats = dict(self._memo_counters)
+        stats['remembered_tiers'] = len(self._tier_memo)
+        stats['remembered_selectors'] = len(self._selector_memo)
+        return stats
+    
+    def breaker_states(self, url: str) -> Dict[str, Dict]:
+        """Состояние предохранителей всех уровней каскада источника"""
+        return {tier: self.breakers.snapshot((url, tier)) for tier in self._cascade_tiers(url)}
 
-    # ===== СПЕЦИАЛИЗИРОВАННЫЙ ПАРСЕР ДЛЯ РИА НОВОСТЕЙ =====
+    def _listing_selectors(self, url: str) -> List[str]:
+        """Селекторы элементов списка новостей для источника"""
+        return {
+            'RIA.ru': self.RIA_ITEM_SELECTORS,
+            'TASS': self.TASS_ITEM_SELECTORS,
+            'Интерфакс': self.INTERFAX_ITEM_SELECTORS,
+            'Доктор Питер': self.DOCTORPITER_ITEM_SELECTORS,
+        }.get(self._extract_source_name(url), self.GENERIC_ITEM_SELECTORS)
     
-    def _parse_ria_news_advanced(self, url: str, category: str) -> List[Dict]:
-        """Специализированный парсер для РИА Новостей"""
-        print(f"🔍 Парсим РИА Новости: {url}")
-        soup = self._make_request(url, use_selenium=False)
-        if not soup:
-            return []
-        
-        news_items = []
-        seen_links = set()
-        
-        # Селекторы для элементов новостей РИА
-        item_selectors = ['.cell-list__item', '.list-item', '.news-item', '[data-type="news"]']
-        items = []
-        
-        for selector in item_selectors:
-            found_items = soup.select(selector)
-            if found_items:
-                items.extend(found_items)
-        
-        for item in items:
-            try:
-                # Извлечение заголовка
-                title = self._extract_ria_title(item)
-                if not title:
-                    continue
-                
-                # Извлечение и проверка ссылки
-                link = self._extract_ria_link(item)
-                if not link or link in seen_links:
-                    continue
-                seen_links.add(link)
-                
-                # Парсинг даты и времени
-                date, time = self._parse_ria_date_time(item)
-                
-                # Извлечение изображения
-                image = self._extract_ria_image_url(item)
-                
-                news_item = {
-                    'title': title,
-                    'date': date,
-                    'time': time,
-                    'image': image,
-                    'link': link,
-                    'source': 'RIA.ru'
-                }
-                
-                news_items.append(news_item)
-                
-            except Exception as e:
-                print(f"⚠️ Ошибка обработки элемента РИА: {e}")
-                continue
+    def _listing_site(self, url: str):
+        """
+        Описание источника из site_specs и подставляемые значения полей.
+        Неизвестные источники разбираются общим описанием 'generic'
+        """
+        source_name = self._extract_source_name(url)
+        print(f"🔍 Извлекаем новости для {source_name}")
         
-        print(f"✅ РИА Новости: собрано {len(news_items)} новостей")
-        return news_items
+        site = SITES.get(source_name)
+        if site is None:
+            return SITES['generic'], {'source': source_name}
+        return site, None
     
-    def _extract_ria_title(self, item) -> Optional[str]:
-        """Извлечение заголовка для РИА"""
-        title_selectors = [
-            '.cell-list__item-title', 
-            '.list-item__title', 
-            'h2', 
-            'h3',
-            '.news-item__title'
-        ]
-        
-        title_tag = None
-        for selector in title_selectors:
-            title_tag = item.select_one(selector)
-            if title_tag:
-                break
-        
-        if not title_tag:
-            title_tag = item
-        
-        title = title_tag.get_text().strip()
-        return title if title and len(title) >= 10 else None
+    def _extract_listing(self, root, url: str) -> List[Dict]:
+        """Новости со страницы-списка, уже разобранной целиком"""
+        site, values = self._listing_site(url)
+        return site.extract(root, url, memo=self._listing_memo, values=values, verbose=True)
     
-    def _extract_ria_link(self, item) -> Optional[str]:
-        """Извлечение ссылки для РИА"""
-        link = item.get('href', '')
-        
-        if not link:
-            link_tag = item.select_one('a[href]')
-            if link_tag:
-                link = link_tag.get('href', '')
-        
-        if not link:
-            return None
-        
-        # Нормализация URL для РИА
-        if link.startswith('/'):
-            link = 'https://ria.ru' + link
-        elif link.startswith('//'):
-            link = 'https:' + link
-        
-        return link
+    def _extract_listing_stream(self, response, url: str) -> List[Dict]:
+        """
+        Новости со страницы-списка по мере загрузки: сокет перестаём читать,
+        как только первые LISTING_ITEM_LIMIT новостей уже не изменятся
+        """
+        site, values = self._listing_site(url)
+        try:
+            return site.extract_stream(
+                response.iter_content(LISTING_CHUNK_SIZE), url, limit=LISTING_ITEM_LIMIT,
+                memo=self._listing_memo, values=values, verbose=True
+            )
+        finally:
+            response.close()
     
-    def _parse_ria_date_time(self, item) -> tuple[str, str]:
-        """Парсинг даты и времени для РИА"""
-        date, time = '', ''
-        
-        date_selectors = ['.cell-info__date', '[data-type="date"]', '.list-item__info']
-        date_element = None
-        
-        for selector in date_selectors:
-            date_element = item.select_one(selector)
-            if date_element:
-                break
-        
-        if not date_element:
-            return self.get_today_date(), ''
-        
-        date_text = date_element.get_text().strip()
-        
-        if ',' in date_text:
-            parts = date_text.split(',', 1)
-            if len(parts) == 2:
-                date_part, time_part = parts
-                date = date_part.strip()
-                time = self._extract_time_from_text(time_part.strip())
-        else:
-            if ':' in date_text:
-                time = self._extract_time_from_text(date_text)
-                date = 'Сегодня' if time else ''
-            else:
-                date = date_text
-        
-        if time and not date:
-            date = 'Сегодня'
-            
-        return date or self.get_today_date(), time
+    def _fetch_listing(self, url: str, key) -> Optional[List[Dict]]:
+        """
+        Страница-список статическим запросом. Читается потоково, кроме случая с дисковым кэшем:
+        он сохраняет только полностью скачанные ответы
+        """
+        if self.session.cache is None:
+            return self._fetch_revalidated(
+                url, lambda response: self._extract_listing_stream(response, url), key=key, stream=True
+            )
+        return self._fetch_revalidated(url, lambda root: self._extract_listing(root, url), key=key, tree=True)
     
-    def _extract_ria_image_url(self, item) -> str:
-        """Извлечение изображения для РИА"""
-        image = ''
-        
-        img_container = item.select_one('.cell-list__item-img')
-        if img_container:
-            img_tag = img_container.select_one('img')
-            if img_tag:
-                image = img_tag.get('src') or img_tag.get('data-src') or ''
-        
-        if not image:
-            img_tag = item.select_one('img')
-            if img_tag:
-                image = img_tag.get('src') or img_tag.get('data-src') or ''
-        
-        if not image:
-            div_with_bg = item.select_one('[style*="background-image"]')
-            if div_with_bg and div_with_bg.get('style'):
-                style = div_with_bg['style']
-                if 'url(' in style:
-                    start = style.find('url(')
-                    end = style.find(')', start)
-                    if start != -1 and end != -1:
-                        image = style[start+4:end].strip('"\'')
-        
-        if image:
-            if image.startswith('//'):
-                image = 'https:' + image
-            elif image.startswith('/'):
-                image = 'https://ria.ru' + image
-        
-        return image
+    # ===== СПЕЦИАЛИЗИРОВАННЫЙ ПАРСЕР ДЛЯ РИА НОВОСТЕЙ =====
+    
+    def _parse_ria_news_advanced(self, url: str, category: str) -> List[Dict]:
+        """Специализированный парсер для РИА Новостей"""
+        print(f"🔍 Парсим РИА Новости: {url}")
+        return self._fetch_listing(url, key=(url, 'ria')) or []
     
-    def _extract_time_from_text(self, time_text: str) -> str:
-        """Извлекает время из текста в формате ЧЧ:ММ"""
-        time_clean = ''
-        colon_found = False
-        digits_after_colon = 0
-        
-        for char in time_text:
-            if char == ':':
-                colon_found = True
-                time_clean += char
-            elif char.isdigit():
-                if colon_found:
-                    digits_after_colon += 1
-                    if digits_after_colon <= 2:
-                        time_clean += char
-                    else:
-                        break
-                else:
-                    time_clean += char
-            else:
-                break
-        
-        return time_clean
-
     # ===== УНИВЕРСАЛЬНЫЙ ПАРСЕР ДЛЯ ДРУГИХ ИСТОЧНИКОВ =====
     
     def _parse_rss_feed_advanced(self, rss_url: str) -> List[Dict]:
         """Улучшенный парсинг RSS с обработкой разных форматов"""
         print(f"📡 Парсим RSS: {rss_url}")
-        news_items = []
         
         try:
-            feed = feedparser.parse(rss_url)
-            
-            if not feed.entries:
-                print("⚠️ RSS feed пуст или недоступен")
-                return []
-            
-            print(f"📊 Найдено RSS записей: {len(feed.entries)}")
-            
-            for i, entry in enumerate(feed.entries[:20]):
-                try:
-                    pub_date = self._parse_rss_date(entry)
-                    image_url = self._extract_rss_image(entry)
-                    
-                    news_item = {
-                        'title': entry.title,
-                        'date': pub_date,
-                        'time': self._extract_time_from_rss(entry),
-                        'image': image_url,
-                        'link': entry.link,
-                        'source': self._extract_source_name(rss_url),
-                        'description': getattr(entry, 'description', '')[:200] + '...' if hasattr(entry, 'description') else ''
-                    }
-                    news_items.append(news_item)
-                    
-                    if i < 3:
-                        print(f"   ✅ {i+1}. {entry.title[:60]}...")
-                        
-                except Exception as e:
-                    print(f"   ⚠️ Ошибка обработки RSS элемента: {e}")
-                    continue
-                    
+            self._wait_politeness(rss_url)
+            # Через общую сессию (таймауты, keep-alive, условные запросы) и потоково:
+            # чтение прекращается, как только набрано RSS_ENTRY_LIMIT записей.
+            # С дисковым кэшем лента качается целиком - он сохраняет только полные ответы
+            return self.revalidator.fetch(
+                rss_url,
+                lambda response: self._extract_rss_items(
+                    read_feed(response, limit=RSS_ENTRY_LIMIT, deadline_seconds=RSS_DEADLINE), rss_url
+                ),
+                get=self.session.get,
+                key=(rss_url, 'rss'),
+                headers=self._request_headers(),
+                stream=self.session.cache is None
+            )
         except Exception as e:
             print(f"❌ Критическая ошибка RSS парсинга: {e}")
+            return []
+    
+    def _extract_rss_items(self, feed, rss_url: str) -> List[Dict]:
+        """Новости из разобранной ленты (feed_reader или feedparser)"""
+        news_items = []
+        
+        if not feed.entries:
+            print("⚠️ RSS feed пуст или недоступен")
+            return []
+        
+        print(f"📊 Найдено RSS записей: {len(feed.entries)}")
+        
+        for i, entry in enumerate(feed.entries[:RSS_ENTRY_LIMIT]):
+            try:
+                pub_date = self._parse_rss_date(entry)
+                image_url = self._extract_rss_image(entry)
+                
+                news_item = NewsItem(
+                    title=entry.title,
+                    date=pub_date,
+                    time=self._extract_time_from_rss(entry),
+                    published_at=self._rss_timestamp(entry),
+                    image=image_url,
+                    link=entry.link,
+                    source=self._extract_source_name(rss_url),
+                    description=getattr(entry, 'description', '')[:200] + '...' if hasattr(entry, 'description') else ''
+                )
+                news_items.append(news_item)
+                
+                if i < 3:
+                    print(f"   ✅ {i+1}. {entry.title[:60]}...")
+                    
+            except Exception as e:
+                print(f"   ⚠️ Ошибка обработки RSS элемента: {e}")
+                continue
         
         return news_items
     
@@ -393,6 +554,17 @@ class AdvancedNewsParser:
         
         return self.get_today_date()
     
+    def _rss_timestamp(self, entry) -> int:
+        """Время публикации из RSS в секундах Unix (struct_time ленты - в UTC); 0, если его нет"""
+        for name in ('published_parsed', 'updated_parsed'):
+            parsed = getattr(entry, name, None)
+            if parsed:
+                try:
+                    return calendar.timegm(tuple(parsed)[:6] + (0, 0, 0))
+                except (TypeError, ValueError, OverflowError):
+                    pass
+        return 0
+    
     def _extract_rss_image(self, entry) -> str:
         """Извлечение изображения из RSS записи"""
         image_url = ''
@@ -417,356 +589,6 @@ class AdvancedNewsParser:
         
         return image_url
     
-    def _extract_news_advanced(self, soup: BeautifulSoup, url: str, source_type: str) -> List[Dict]:
-        """
-        Улучшенный парсинг HTML для ТАСС, Интерфакс и Доктор Питер
-        """
-        news_items = []
-        source_name = self._extract_source_name(url)
-        
-        print(f"🔍 Извлекаем новости для {source_name}")
-        
-        # Специфичные стратегии для каждого источника
-        extraction_methods = {
-            'tass.ru': self._extract_tass_news,
-            'interfax.ru': self._extract_interfax_news,
-            'doctorpiter.ru': self._extract_doctorpiter_news
-        }
-        
-        method = extraction_methods.get(source_name, self._extract_generic_news)
-        news_items = method(soup, url)
-        
-        return news_items
-    
-    def _extract_tass_news(self, soup: BeautifulSoup, url: str) -> List[Dict]:
-        """Специфичный парсинг для TASS"""
-        news_items = []
-        
-        selectors = [
-            '.news-line__item',
-            '.news-list__item', 
-            '.content-big-newslist__item',
-            '.b-material-list__item',
-            'article'
-        ]
-        
-        for selector in selectors:
-            articles = soup.select(selector)
-            if articles:
-                print(f"✅ TASS: найдены элементы по селектору '{selector}': {len(articles)}")
-                
-                for article in articles[:20]:
-                    try:
-                        title_elem = article.select_one('.news-line__title, .news-list__title, .b-material-list__title, h2, h3, h4, a')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text().strip()
-                        if len(title) < 5:
-                            continue
-                        
-                        link_elem = article.select_one('a[href]')
-                        if not link_elem:
-                            continue
-                            
-                        link = self._normalize_url(link_elem.get('href'), 'tass.ru')
-                        if not link:
-                            continue
-                        
-                        image_url = self._extract_tass_image(article)
-                        
-                        news_item = {
-                            'title': title[:100] + "..." if len(title) > 100 else title,
-                            'date': self.get_today_date(),
-                            'time': '',
-                            'image': image_url,
-                            'link': link,
-                            'source': 'TASS'
-                        }
-                        
-                        news_items.append(news_item)
-                        
-                    except Exception as e:
-                        print(f"⚠️ Ошибка обработки элемента TASS: {e}")
-                        continue
-                
-                if news_items:
-                    break
-        
-        return news_items
-    
-    def _extract_interfax_news(self, soup: BeautifulSoup, url: str) -> List[Dict]:
-        """Парсинг для Интерфакс - надежный источник с хорошей структурой"""
-        news_items = []
-        
-        # Селекторы для Интерфакс
-        selectors = [
-            '.newsPage__list .timeline__item',
-            '.newsList .newsItem',
-            '.main-newslist .news-item',
-            '.news-feed-list .news-feed-item',
-            'article',
-            '.news'
-        ]
-        
-        for selector in selectors:
-            articles = soup.select(selector)
-            if articles:
-                print(f"✅ Интерфакс: найдены элементы по селектору '{selector}': {len(articles)}")
-                
-                for article in articles[:20]:
-                    try:
-                        # Селекторы заголовков для Интерфакс
-                        title_elem = article.select_one(
-                            '.timeline__item-title, .newsItem__title, '
-                            '.news-item__title, h3, h4, .title, a'
-                        )
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text().strip()
-                        if len(title) < 10 or len(title) > 300:
-                            continue
-                        
-                        link_elem = article.select_one('a[href]')
-                        if not link_elem:
-                            continue
-                            
-                        link = self._normalize_url(link_elem.get('href'), 'interfax.ru')
-                        if not link or 'interfax.ru' not in link:
-                            continue
-                        
-                        image_url = self._extract_interfax_image(article)
-                        
-                        news_item = {
-                            'title': title[:100] + "..." if len(title) > 100 else title,
-                            'date': self.get_today_date(),
-                            'time': '',
-                            'image': image_url,
-                            'link': link,
-                            'source': 'Интерфакс'
-                        }
-                        
-                        news_items.append(news_item)
-                        
-                    except Exception as e:
-                        print(f"⚠️ Ошибка обработки элемента Интерфакс: {e}")
-                        continue
-                
-                if len(news_items) >= 5:
-                    break
-        
-        return news_items
-    
-    def _extract_doctorpiter_news(self, soup: BeautifulSoup, url: str) -> List[Dict]:
-        """Парсинг для Доктор Питер - надежный медицинский портал"""
-        news_items = []
-        
-        # Селекторы для Доктор Питер
-        selectors = [
-            '.news-item',
-            '.article-preview',
-            '.news-list-item',
-            '.item-news',
-            'article.news',
-            '.b-news-item'
-        ]
-        
-        for selector in selectors:
-            articles = soup.select(selector)
-            if articles:
-                print(f"✅ Доктор Питер: найдены элементы по селектору '{selector}': {len(articles)}")
-                
-                for article in articles[:20]:
-                    try:
-                        # Селекторы заголовков для Доктор Питер
-                        title_elem = article.select_one(
-                            '.news-item__title, .article-preview__title, '
-                            '.news-list-item__title, .item-news__title, '
-                            'h2, h3, h4, .title, a'
-                        )
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text().strip()
-                        if len(title) < 10 or len(title) > 300:
-                            continue
-                        
-                        link_elem = article.select_one('a[href]')
-                        if not link_elem:
-                            continue
-                            
-                        link = self._normalize_url(link_elem.get('href'), 'doctorpiter.ru')
-                        if not link or 'doctorpiter.ru' not in link:
-                            continue
-                        
-                        image_url = self._extract_doctorpiter_image(article)
-                        
-                        news_item = {
-                            'title': title[:100] + "..." if len(title) > 100 else title,
-                            'date': self.get_today_date(),
-                            'time': '',
-                            'image': image_url,
-                            'link': link,
-                            'source': 'Доктор Питер'
-                        }
-                        
-                        news_items.append(news_item)
-                        
-                    except Exception as e:
-                        print(f"⚠️ Ошибка обработки элемента Доктор Питер: {e}")
-                        continue
-                
-                if len(news_items) >= 5:
-                    break
-        
-        return news_items
-    
-    def _extract_interfax_image(self, article) -> str:
-        """Извлечение изображения для Интерфакс"""
-        img_selectors = [
-            'img',
-            '.timeline__item-img img',
-            '.newsItem__image img',
-            '.news-item__image img',
-            '[data-src]'
-        ]
-        
-        for selector in img_selectors:
-            img_elem = article.select_one(selector)
-            if img_elem:
-                src = img_elem.get('src') or img_elem.get('data-src')
-                if src:
-                    return self._normalize_url(src, 'interfax.ru')
-        return ''
-    
-    def _extract_doctorpiter_image(self, article) -> str:
-        """Извлечение изображения для Доктор Питер"""
-        img_selectors = [
-            'img',
-            '.news-item__image img',
-            '.article-preview__image img',
-            '.news-list-item__image img',
-            '.item-news__image img',
-            '[data-src]'
-        ]
-        
-        for selector in img_selectors:
-            img_elem = article.select_one(selector)
-            if img_elem:
-                src = img_elem.get('src') or img_elem.get('data-src')
-                if src:
-                    return self._normalize_url(src, 'doctorpiter.ru')
-        return ''
-    
-    def _extract_tass_image(self, article) -> str:
-        """Извлечение изображения для TASS"""
-        img_selectors = [
-            'img',
-            '.news-line__image img',
-            '.b-material-list__image img',
-            '[data-src]'
-        ]
-        
-        for selector in img_selectors:
-            img_elem = article.select_one(selector)
-            if img_elem:
-                src = img_elem.get('src') or img_elem.get('data-src')
-                if src:
-                    return self._normalize_url(src, 'tass.ru')
-        return ''
-    
-    def _extract_generic_news(self, soup: BeautifulSoup, url: str) -> List[Dict]:
-        """Универсальный парсинг для неизвестных источников"""
-        news_items = []
-        
-        universal_selectors = [
-            'article',
-            '.news-item',
-            '.item',
-            '.card',
-            '.post',
-            '[class*="news"]',
-            '[class*="article"]',
-            '.news'
-        ]
-        
-        for selector in universal_selectors:
-            articles = soup.select(selector)
-            if articles:
-                print(f"🌐 Универсальный парсинг: найдено {len(articles)} элементов по селектору '{selector}'")
-                
-                for article in articles[:15]:
-                    try:
-                        title_elem = article.select_one('h1, h2, h3, h4, h5, .title, .heading, [class*="title"], [class*="heading"]')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text().strip()
-                        if len(title) < 5 or len(title) > 500:
-                            continue
-                        
-                        link_elem = article.select_one('a[href]')
-                        if not link_elem:
-                            continue
-                            
-                        link = link_elem.get('href')
-                        if not link or link.startswith('javascript:'):
-                            continue
-                            
-                        if link.startswith('/'):
-                            base_domain = re.findall(r'https?://[^/]+', url)[0]
-                            link = base_domain + link
-                        elif not link.startswith('http'):
-                            link = url + link
-                        
-                        img_elem = article.select_one('img')
-                        image_url = img_elem.get('src') if img_elem else ''
-                        
-                        news_item = {
-                            'title': title[:100] + "..." if len(title) > 100 else title,
-                            'date': self.get_today_date(),
-                            'time': '',
-                            'image': image_url,
-                            'link': link,
-                            'source': self._extract_source_name(url)
-                        }
-                        
-                        news_items.append(news_item)
-                        
-                    except Exception as e:
-                        continue
-                
-                if news_items:
-                    break
-        
-        return news_items
-    
-    def _normalize_url(self, url: str, source_name: str) -> str:
-        """Нормализация URL в зависимости от источника"""
-        if not url or url.startswith('javascript:'):
-            return ''
-        
-        url = url.strip()
-        
-        source_domains = {
-            'ria.ru': 'https://ria.ru',
-            'tass.ru': 'https://tass.ru', 
-            'interfax.ru': 'https://www.interfax.ru',
-            'doctorpiter.ru': 'https://doctorpiter.ru'
-        }
-        
-        base_domain = source_domains.get(source_name, '')
-        
-        if url.startswith('//'):
-            return 'https:' + url
-        elif url.startswith('/'):
-            return base_domain + url
-        elif not url.startswith('http'):
-            return base_domain + '/' + url
-        
-        return url
-    
     def _extract_time_from_rss(self, entry) -> str:
         """Извлечение времени из RSS"""
         try:
@@ -798,108 +620,50 @@ class AdvancedNewsParser:
     
     def _is_table_of_contents(self, text: str) -> bool:
         """Определяет, является ли текст оглавлением"""
-        toc_indicators = [
-            'оглавление', 'содержание', 'содержит', 'в статье', 
-            'читайте также', 'table of contents', 'toc',
-            'введение', 'заголовок', 'раздел', 'часть', 'глава'
-        ]
-        
-        text_lower = text.lower().strip()
-        if len(text_lower) < 50:
-            return False
-            
-        for indicator in toc_indicators:
-            if indicator in text_lower:
-                return True
-        
-        toc_patterns = [
-            r'^\d+\.\s',
-            r'^[ivx]+\.\s',
-            r'^раздел\s+\d+',
-            r'^часть\s+\d+',
-            r'^глава\s+\d+',
-        ]
-        
-        first_line = text_lower.split('\n')[0] if '\n' in text_lower else text_lower
-        for pattern in toc_patterns:
-            if re.search(pattern, first_line):
-                return True
-        
-        return False
+        return is_table_of_contents(text)
     
     def _extract_news_preview(self, text: str, preview_length: int = 300) -> str:
         """Извлекает превью новости, пропуская оглавление"""
-        lines = text.split('\n')
-        news_lines = []
-        
-        skip_toc = True
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if skip_toc:
-                if self._is_table_of_contents(line):
-                    continue
-                if len(line) > 50 and not self._is_table_of_contents(line):
-                    skip_toc = False
-                    news_lines.append(line)
-            else:
-                news_lines.append(line)
-        
-        if not news_lines:
-            news_lines = [line.strip() for line in lines if line.strip()]
-        
-        preview_text = ' '.join(news_lines)
-        
-        if len(preview_text) > preview_length:
-            preview_text = preview_text[:preview_length]
-            last_space = preview_text.rfind(' ')
-            if last_space > preview_length * 0.7:
-                preview_text = preview_text[:last_space]
-            preview_text += '...'
-        
-        return preview_text
+        return extract_news_preview(text, preview_length)
     
     def get_full_article_text(self, url: str, preserve_formatting: bool = True) -> str:
         """Получает полный текст статьи с сохранением форматирования"""
+        variant = f'text:{int(preserve_formatting)}'
+        text = self.article_cache.get(url, variant)
+        if text is not None:
+            print(f"📦 Текст статьи из кэша: {url}")
+            return text
+        
         print(f"📖 Получаем полный текст: {url}")
         
         # Для РИА Новостей используем специализированный метод
         if 'ria.ru' in url:
-            return self._get_ria_full_article_text(url, preserve_formatting)
+            text = self._get_ria_full_article_text(url, preserve_formatting, variant)
+            self.article_cache.touch(url, variant)
+            return text
         
         # Для других источников используем общий метод
-        soup = self._make_request(url, use_selenium=False)
-        if not soup:
-            soup = self._make_request(url, use_selenium=True)
-        
-        if not soup:
-            return ''
-        
-        content_selectors = [
-            'div.article__body',
-            'div.article-text',
-            'div.b-text',
-            'article',
-            'div.content',
-            'div.post-content',
-            '[class*="article"]',
-            '[class*="content"]'
-        ]
+        extract = lambda soup: self._extract_article_text(soup, preserve_formatting)
+        text = self._fetch_revalidated(
+            url, extract, key=(url, 'article', preserve_formatting), cache_variant=variant
+        )
+        if text is None:
+            soup = self._make_request(url, use_selenium=True, ready_selectors=self.ARTICLE_CONTENT_SELECTORS)
+            text = extract(soup) if soup else ''
+            self.article_cache.put(url, variant, text)
+        else:
+            self.article_cache.touch(url, variant)
         
-        for selector in content_selectors:
+        return text
+    
+    def _extract_article_text(self, soup: BeautifulSoup, preserve_formatting: bool = True) -> str:
+        """Текст статьи со страницы произвольного источника"""
+        for selector in self.ARTICLE_CONTENT_SELECTORS:
             content_div = soup.select_one(selector)
             if content_div:
-                unwanted_selectors = [
-                    'script', 'style', '.ad', '.banner', '.social', '.share',
-                    '.article__info', '.article__meta', '.article__tags',
-                    '.recommended', '.related', '.comments', '.advertisement'
-                ]
-                
-                for unwanted in unwanted_selectors:
-                    for elem in content_div.select(unwanted):
-                        elem.decompose()
+                # Один проход select по объединённому селектору вместо прохода на каждый
+                for elem in content_div.select(self.UNWANTED_ARTICLE_SELECTOR):
+                    elem.decompose()
                 
                 if preserve_formatting:
                     return self._extract_formatted_text(content_div)
@@ -910,34 +674,23 @@ class AdvancedNewsParser:
         
         return ''
     
-    def _get_ria_full_article_text(self, url: str, preserve_formatting: bool = True) -> str:
+    def _get_ria_full_article_text(self, url: str, preserve_formatting: bool = True,
+                                   cache_variant: Optional[str] = None) -> str:
         """Специализированный метод для получения полного текста РИА"""
-        soup = self._make_request(url)
-        if not soup:
-            return ''
-        
-        content_selectors = [
-            'div.article__body',
-            'div.article__text',
-            'article',
-            '.content',
-            '.post-content',
-            '[class*="article"]',
-            '[class*="content"]'
-        ]
-        
-        for selector in content_selectors:
+        text = self._fetch_revalidated(
+            url, lambda soup: self._extract_ria_article_text(soup, preserve_formatting),
+            key=(url, 'ria_article', preserve_formatting), cache_variant=cache_variant
+        )
+        return text or ''
+    
+    def _extract_ria_article_text(self, soup: BeautifulSoup, preserve_formatting: bool = True) -> str:
+        """Текст статьи со страницы РИА"""
+        for selector in self.RIA_ARTICLE_CONTENT_SELECTORS:
             content_div = soup.select_one(selector)
             if content_div:
-                unwanted_selectors = [
-                    'script', 'style', '.ad', '.banner', '.social', '.share',
-                    '.article__info', '.article__meta', '.article__tags',
-                    '.recommended', '.related', '.comments', '.advertisement'
-                ]
-                
-                for unwanted in unwanted_selectors:
-                    for elem in content_div.select(unwanted):
-                        elem.decompose()
+                # Один проход select по объединённому селектору вместо прохода на каждый
+                for elem in content_div.select(self.UNWANTED_ARTICLE_SELECTOR):
+                    elem.decompose()
                 
                 if preserve_formatting:
                     return self._extract_formatted_text(content_div)
@@ -950,46 +703,75 @@ class AdvancedNewsParser:
     
     def get_article_preview(self, url: str, preview_length: int = 300) -> str:
         """Получает превью статьи без оглавления"""
+        variant = f'preview:{preview_length}'
+        preview = self.article_cache.get(url, variant)
+        if preview is not None:
+            return preview
+        
         full_text = self.get_full_article_text(url, preserve_formatting=True)
         if not full_text:
             return ''
         
-        return self._extract_news_preview(full_text, preview_length)
+        # Превью пересчитывается, только если изменился текст статьи
+        return self.article_cache.derive(
+            url, variant, full_text, lambda text: self._extract_news_preview(text, preview_length)
+        )
+    
+    def article_cache_stats(self) -> Dict[str, int]:
+        return self.article_cache.stats()
+    
+    def get_full_article_texts(self, urls: Iterable[str], preserve_formatting: bool = True,
+                               max_workers: Optional[int] = None,
+                               per_host: int = DEFAULT_PER_HOST) -> Iterator[Tuple[str, str]]:
+        """
+        Полные тексты пачки статей: пары (url, текст) по мере готовности.
+        Статьи качаются параллельно, не больше per_host одновременно с одного сайта,
+        вместо случайной паузы перед каждым запросом - token bucket хоста с темпом BATCH_HOST_RATE.
+        Вежливость к сайту держится прежде всего на per_host: чем он больше, тем сильнее нагрузка
+        """
+        return fetch_batch(
+            urls, lambda url: self._per_host(
+                self.get_full_article_text, url, preserve_formatting, limiter=self.batch_host_limiter
+            ),
+            max_workers=max_workers or self.max_workers, per_host=per_host, default=''
+        )
+    
+    def get_article_previews(self, urls: Iterable[str], preview_length: int = 300,
+                             max_workers: Optional[int] = None,
+                             per_host: int = DEFAULT_PER_HOST) -> Iterator[Tuple[str, str]]:
+        """
+        Превью пачки статей: пары (url, превью).
+        Свежие превью из кэша отдаются сразу, для остальных тексты качаются get_full_article_texts,
+        а превью считаются одним пакетом extract_news_previews, когда скачаны все тексты
+        """
+        variant = f'preview:{preview_length}'
+        missing = []
+        for url in dict.fromkeys(urls):
+            preview = self.article_cache.get(url, variant)
+            if preview is None:
+                missing.append(url)
+            else:
+                yield url, preview
+        if not missing:
+            return
+        
+        texts = list(self.get_full_article_texts(missing, True, max_workers=max_workers, per_host=per_host))
+        # Пустой текст - пустое превью, в кэш не попадает (как в get_article_preview)
+        fetched = [(url, text) for url, text in texts if text]
+        previews = self.article_cache.derive_many(
+            fetched, variant, lambda batch: extract_news_previews(batch, preview_length)
+        )
+        yield from zip((url for url, _ in fetched), previews)
+        for url, text in texts:
+            if not text:
+                yield url, ''
     
     def _extract_formatted_text(self, content_div) -> str:
-        """Извлекает текст с сохранением форматирования и переносов строк"""
-        temp_div = BeautifulSoup(content_div.prettify(), 'html.parser')
-        
-        for tag in temp_div.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            tag.insert_after('\n\n')
-            tag.insert_before('\n\n')
-        
-        for tag in temp_div.find_all('p'):
-            tag.insert_after('\n\n')
-        
-        for tag in temp_div.find_all(['ul', 'ol']):
-            tag.insert_after('\n')
-            for li in tag.find_all('li'):
-                li.insert_after('\n')
-        
-        for tag in temp_div.find_all('div'):
-            if tag.get_text(strip=True):
-                child_tags = tag.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol'])
-                if not child_tags:
-                    tag.insert_after('\n')
-        
-        text = temp_div.get_text()
-        
-        lines = []
-        for line in text.splitlines():
-            line = line.strip()
-            if line:
-                lines.append(line)
-        
-        formatted_text = '\n'.join(lines)
-        formatted_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', formatted_text)
-        
-        return formatted_text.strip()
+        """
+        Текст с сохранением переносов: каждый текстовый узел - с новой строки,
+        строки обрезаны, пустые отброшены. Один обход дерева без prettify и повторного разбора
+        """
+        return text_lines(content_div)
     
     def _clean_text(self, text: str) -> str:
         """Очистка текста от лишних пробелов"""
@@ -998,9 +780,66 @@ class AdvancedNewsParser:
     
     # ===== ОСНОВНЫЕ ФУНКЦИИ ПАРСИНГА ПО КАТЕГОРИЯМ =====
     
-    def parse_category_news(self, category: str) -> Dict[str, List]:
+    def _source_key(self, url: str, parser_type: str) -> str:
+        return f"{self._extract_source_name(url)}_{parser_type}"
+    
+    def _parse_source(self, url: str, parser_type: str, category: str) -> Tuple[str, List[Dict], float]:
+        """Парсит один источник, возвращает (ключ источника, новости, время в секундах)"""
+        source_key = self._source_key(url, parser_type)
+        
+        print(f"\n🔍 Обрабатываем: {source_key}")
+        print(f"   URL: {url}")
+        
+        started = time.perf_counter()
+        try:
+            news_from_source = self.shared_feeds.do(
+                url, lambda: self.parse_with_fallback_strategy(url, category)
+            )
+            if news_from_source:
+                print(f"✅ УСПЕХ: {source_key} - {len(news_from_source)} новостей")
+            else:
+                print(f"❌ НОВОСТЕЙ НЕ НАЙДЕНО: {source_key}")
+        except Exception as e:
+            print(f"💥 КРИТИЧЕСКАЯ ОШИБКА {source_key}: {e}")
+            news_from_source = []
+        
+        return source_key, news_from_source, time.perf_counter() - started
+    
+    def _collect_sources_sequential(self, sources: List[Tuple[str, str]], category: str) -> List[Tuple]:
+        """Источники по очереди со случайной паузой между ними"""
+        results = []
+        for url, parser_type in sources:
+            results.append(self._parse_source(url, parser_type, category))
+            time.sleep(random.uniform(2, 4))
+        return results
+    
+    def _per_host(self, func, *args, limiter: Optional[HostRateLimiter] = None):
+        """Вызов func в потоке пула: пауза перед запросами - по token bucket хоста (по умолчанию host_limiter)"""
+        self._local.host_limiter = limiter or self.host_limiter
+        try:
+            return func(*args)
+        finally:
+            self._local.host_limiter = None
+    
+    def _collect_sources_parallel(self, sources: List[Tuple[str, str]], category: str) -> List[Tuple]:
+        """Все источники категории одновременно из ограниченного пула потоков"""
+        workers = max(1, min(self.max_workers, len(sources)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='news-source') as executor:
+            futures = [
+                executor.submit(self._per_host, self._parse_source, url, parser_type, category)
+                for url, parser_type in sources
+            ]
+            # Порядок результатов совпадает с порядком источников в конфигурации
+            return [future.result() for future in futures]
+    
+    @staticmethod
+    def _dedupe_keys(news: Dict) -> Tuple:
+        return ('title', news['title'].strip().lower()[:50]), ('link', url_key(news['link']))
+    
+    def parse_category_news(self, category: str, parallel: Optional[bool] = None) -> Dict[str, List]:
         """
-        Основная функция парсинга с оптимизированными источниками
+        Основная функция парсинга с оптимизированными источниками.
+        parallel=True - все источники категории качаются одновременно (по умолчанию берётся self.parallel)
         """
         print(f"\n{'='*60}")
         print(f"🚀 ЗАПУСК ПАРСИНГА: {category.upper()}")
@@ -1053,51 +892,42 @@ class AdvancedNewsParser:
         if category not in sources_config:
             return {'news': [], 'statistics': {'error': 'Unknown category'}}
         
-        all_news = []
-        source_stats = {}
-        successful_sources = []
+        sources = sources_config[category]
+        if parallel is None:
+            parallel = self.parallel
         
-        # Парсим все источники с улучшенной стратегией
-        for url, parser_type in sources_config[category]:
-            source_name = self._extract_source_name(url)
-            source_key = f"{source_name}_{parser_type}"
-            
-            print(f"\n🔍 Обрабатываем: {source_key}")
-            print(f"   URL: {url}")
-            
-            try:
-                news_from_source = self.parse_with_fallback_strategy(url, category)
-                count = len(news_from_source)
-                source_stats[source_key] = count
-                
-                if count > 0:
-                    successful_sources.append(source_key)
-                    all_news.extend(news_from_source)
-                    print(f"✅ УСПЕХ: {count} новостей")
-                else:
-                    print(f"❌ НОВОСТЕЙ НЕ НАЙДЕНО")
-                
-                time.sleep(random.uniform(2, 4))
-                
-            except Exception as e:
-                print(f"💥 КРИТИЧЕСКАЯ ОШИБКА: {e}")
-                source_stats[source_key] = 0
+        if parallel:
+            results = self._collect_sources_parallel(sources, category)
+        else:
+            results = self._collect_sources_sequential(sources, category)
         
-        self.close_selenium()
+        source_lists = []
+        source_stats = {}
+        source_times = {}
+        successful_sources = []
         
-        # Удаляем дубликаты
-        unique_news = []
-        seen_titles = set()
-        seen_links = set()
+        for source_key, news_from_source, elapsed in results:
+            count = len(news_from_source)
+            source_stats[source_key] = count
+            source_times[source_key] = round(elapsed, 2)
+            if count > 0:
+                successful_sources.append(source_key)
+                # Время публикации разбирается один раз, список источника - от новых к старым
+                source_lists.append(normalize_items(news_from_source))
+        
+        breaker_stats = {
+            self._source_key(url, parser_type): self.breaker_states(url)
+            for url, parser_type in sources
+        }
         
-        for news in all_news:
-            title_key = news['title'].strip().lower()[:50]
-            link_key = news['link']
-            
-            if title_key not in seen_titles and link_key not in seen_links:
-                seen_titles.add(title_key)
-                seen_links.add(link_key)
-                unique_news.append(news)
+        # Общая лента от новых к старым слиянием списков источников, дубликаты по заголовку и ссылке пропускаются,
+        # а одна и та же новость в пересказе разных агентств схлопывается в одну запись.
+        # Слияние останавливается на LISTING_ITEM_LIMIT-й новости: первые N стоят O(N log k), а не O(n log k)
+        unique_news, _ = collapse_near_duplicates(
+            merge_timeline(source_lists, self._dedupe_keys), LISTING_ITEM_LIMIT, stop_at_limit=True
+        )
+        for news in unique_news:
+            news['category'] = category
         
         # Статистика
         print(f"\n{'='*60}")
@@ -1105,32 +935,54 @@ class AdvancedNewsParser:
         print(f"{'='*60}")
         
         total_collected = sum(source_stats.values())
-        total_unique = len(unique_news)
         
         print(f"📈 ОБЩАЯ СТАТИСТИКА:")
         print(f"   Всего собрано: {total_collected}")
-        print(f"   Уникальных новостей: {total_unique}")
+        print(f"   Новостей в ленте: {len(unique_news)}")
         print(f"   Работающих источников: {len(successful_sources)}/{len(sources_config[category])}")
         
         print(f"\n📋 ДЕТАЛЬНАЯ СТАТИСТИКА ПО ИСТОЧНИКАМ:")
         for source, count in source_stats.items():
             status = "✅" if count > 0 else "❌"
-            print(f"   {status} {source}: {count} новостей")
+            print(f"   {status} {source}: {count} новостей за {source_times[source]} с")
         
         return {
-            'news': unique_news[:25],
+            'news': unique_news,
             'statistics': {
                 'total_collected': total_collected,
-                'total_unique': total_unique,
                 'successful_sources': len(successful_sources),
                 'total_sources': len(sources_config[category]),
-                'sources': source_stats
+                'sources': source_stats,
+                'source_times': source_times,
+                'parallel': parallel,
+                'revalidation': self.revalidator.stats(),
+                'shared_feeds': self.shared_feeds.stats(),
+                'browsers': self.driver_pool.stats(),
+                'breakers': breaker_stats,
+                'memo': self.memo_stats()
             }
         }
 
 
-# Создаем экземпляр парсера
-advanced_parser = AdvancedNewsParser()
+# Экземпляр парсера создаётся при первом обращении
+_advanced_parser = None
+_advanced_parser_lock = threading.Lock()
+
+def get_advanced_parser() -> AdvancedNewsParser:
+    global _advanced_parser
+    if _advanced_parser is None:
+        with _advanced_parser_lock:
+            if _advanced_parser is None:
+                _advanced_parser = AdvancedNewsParser()
+                # Прогретые браузеры живут между категориями, закрываем их при выходе
+                atexit.register(_advanced_parser.close_selenium)
+    return _advanced_parser
+
+def __getattr__(name):
+    # Совместимость: PSH.advanced_parser по-прежнему доступен, но создаётся лениво
+    if name == 'advanced_parser':
+        return get_advanced_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ===== ФАБРИЧНЫЕ ФУНКЦИИ ДЛЯ ОБРАТНОЙ СОВМЕСТИМОСТИ =====
 
@@ -1140,14 +992,20 @@ advanced_parser = AdvancedNewsParser()
 ===============================
 """
 
-def parse_latest_news_politics():
-    return advanced_parser.parse_category_news('politics')
+def parse_latest_news_politics(parallel=None):
+    return get_advanced_parser().parse_category_news('politics', parallel)
 
 def get_full_article_text_politics(url):
-    return advanced_parser.get_full_article_text(url)
+    return get_advanced_parser().get_full_article_text(url)
 
 def get_article_preview_politics(url, preview_length=300):
-    return advanced_parser.get_article_preview(url, preview_length)
+    return get_advanced_parser().get_article_preview(url, preview_length)
+
+def get_full_article_texts_politics(urls):
+    return get_advanced_parser().get_full_article_texts(urls)
+
+def get_article_previews_politics(urls, preview_length=300):
+    return get_advanced_parser().get_article_previews(urls, preview_length)
 
 
 """
@@ -1156,14 +1014,20 @@ def get_article_preview_politics(url, preview_length=300):
 ===============================
 """
 
-def parse_latest_news_science():
-    return advanced_parser.parse_category_news('science')
+def parse_latest_news_science(parallel=None):
+    return get_advanced_parser().parse_category_news('science', parallel)
 
 def get_full_article_text_science(url):
-    return advanced_parser.get_full_article_text(url)
+    return get_advanced_parser().get_full_article_text(url)
 
 def get_article_preview_science(url, preview_length=300):
-    return advanced_parser.get_article_preview(url, preview_length)
+    return get_advanced_parser().get_article_preview(url, preview_length)
+
+def get_full_article_texts_science(urls):
+    return get_advanced_parser().get_full_article_texts(urls)
+
+def get_article_previews_science(urls, preview_length=300):
+    return get_advanced_parser().get_article_previews(urls, preview_length)
 
 
 """
@@ -1172,11 +1036,17 @@ def get_article_preview_science(url, preview_length=300):
 ===============================
 """
 
-def parse_latest_news_health():
-    return advanced_parser.parse_category_news('health')
+def parse_latest_news_health(parallel=None):
+    return get_advanced_parser().parse_category_news('health', parallel)
 
 def get_full_article_text_health(url):
-    return advanced_parser.get_full_article_text(url)
+    return get_advanced_parser().get_full_article_text(url)
 
 def get_article_preview_health(url, preview_length=300):
-    return advanced_parser.get_article_preview(url, preview_length)
+    return get_advanced_parser().get_article_preview(url, preview_length)
+
+def get_full_article_texts_health(urls):
+    return get_advanced_parser().get_full_article_texts(urls)
+
+def get_article_previews_health(urls, preview_length=300):
+    return get_advanced_parser().get_article_previews(urls, preview_length)
@@ -1,6 +1,15 @@
-import requests
 from bs4 import BeautifulSoup
 
+from article_cache import default_article_cache as article_cache
+from batch_fetch import fetch_batch
+from near_duplicates import collapse_near_duplicates
+from timeline import normalize_items
+from url_canon import SeenUrls
+from html_parsing import make_tree
+from http_client import get_session
+from revalidation import default_store as revalidator
+from site_specs import SITES
+
 
 URL_SPORT = "https://www.sport.ru"
 URL_EDUCATION = "https://k-obr.spb.ru/o-komitete/news/"
@@ -28,87 +37,106 @@ URL_IT = "https://habr.com/ru/news/top/daily/"
 
 - parse_latest_news_it(url): принимает URL ленты статей Habr (URL_IT), возвращает словарь news (см. выше)
 - get_full_article_text_it(url): принимает URL статьи Habr, возвращает строку с полным текстом статьи.
-"""
 
+- get_full_article_texts_sport/education/it(urls): принимает список ссылок (например, все новости из parse_*),
+  качает статьи параллельно (не больше двух одновременно с одного сайта) и отдаёт пары (url, текст) по мере готовности.
 
-"""
-===============================
-===          SPORT          ===
-===============================
-"""
-
-def parse_main_news_sport(url):
-    response = requests.get(url)
-    response.encoding = 'windows-1251'
-    soup = BeautifulSoup(response.text, 'lxml')
+Все загрузки идут через общую сессию http_client (пул keep-alive соединений, таймауты, сжатие)
+и условные запросы (ETag / Last-Modified): если страница не изменилась, сервер отвечает 304
+и возвращается ранее извлечённый результат. Счётчики: revalidation_stats().
+Тексты статей дополнительно хранятся в кэше article_cache: пока запись свежая, сайт не запрашивается,
+а если страница не изменилась по хэшу - текст не извлекается заново. Счётчики: article_cache_stats().
 
-    news_dict = {'news': []}
-    articles = soup.select('div.articles-item.articles-item-large')
+Списки новостей описаны декларативно в site_specs.py и разбираются скомпилированными XPath.
 
-    for article in articles:
-        title_tag = article.select_one('h3 a')
-        date_tag = article.select_one('span.date')
-        img_tag = article.select_one('div.articles-item-image a img')
-        link_tag = article.select_one('div.articles-item-image a')
+Почти одинаковые новости в ленте схлопываются в одну (near_duplicates), у оставшейся - поле duplicates.
+Каждой новости проставляется published_at (секунды Unix, см. timeline), лента отсортирована от новых к старым.
 
-        if not (title_tag and date_tag and img_tag and link_tag):
-            continue
+Функции parse_* принимают необязательный limit: если нужны только первые limit новостей,
+страница разбирается по мере загрузки и дальше не дочитывается.
+"""
 
-        date_time_str = date_tag.text.strip()
-        if ',' in date_time_str:
-            date, time = map(str.strip, date_time_str.split(',', 1))
-        else:
-            date, time = date_time_str, ''
+# Размер куска при потоковом чтении страниц-списков
+CHUNK_SIZE = 16 * 1024
 
-        news_dict['news'].append({
-            'title': title_tag.text.strip(),
-            'date': date,
-            'time': time,
-            'image': img_tag['src'],
-            'link': link_tag['href']
-        })
 
-    return news_dict
+def _fetch(url, extract, stream=False, key=None):
+    return revalidator.fetch(url, extract, get=get_session().get, key=key, stream=stream)
 
-def parse_latest_news_sport(url):
-    response = requests.get(url)
-    response.encoding = 'windows-1251'
-    soup = BeautifulSoup(response.text, 'lxml')
+def revalidation_stats():
+    return revalidator.stats()
 
-    news_dict = {'news': []}
-    wrappers = soup.select('div.lst-itm, div.lst-itm.lst-itm-hid')
+def article_cache_stats():
+    return article_cache.stats()
 
-    for wrapper in wrappers:
-        article = wrapper.select_one('div.articles-item.articles-item-large')
-        if not article:
-            continue
+def _fetch_article(url, extract):
+    """Текст статьи через кэш article_cache"""
+    text = article_cache.get(url, 'text')
+    if text is not None:
+        return text
+    text = _fetch(url, article_cache.extractor(url, 'text', extract))
+    article_cache.touch(url, 'text')
+    return text
 
-        title_tag = article.select_one('h3 a')
-        date_tag = article.select_one('span.date')
-        img_tag = article.select_one('div.articles-item-image a img')
-        link_tag = article.select_one('div.articles-item-image a')
+def _fetch_listing(url, site, encoding='utf-8', limit=None):
+    """
+    Страница-список по описанию источника из site_specs.
+    С limit тело читается потоково, кроме случая с дисковым кэшем: он сохраняет только полные ответы.
+    Результат с limit хранится для ревалидации под своим ключом, чтобы 304 не отдал обрезанный список
+    вызову без limit
+    """
+    key = (url, limit) if limit else url
+    if limit and get_session().cache is None:
+        result = _fetch(url, _extract_listing_stream(site, encoding, limit), stream=True, key=key)
+    else:
+        result = _fetch(url, _extract_listing(site, encoding, limit), key=key)
+    # Одна ссылка в разных записях (http/https, www, метки кампаний) - одна новость,
+    # почти одинаковые новости ленты (перепечатки, обновлённые заголовки) - одной записью
+    seen = SeenUrls()
+    news = [item for item in result['news'] if not item.get('link') or seen.add(item['link'])]
+    news, _ = collapse_near_duplicates(news)
+    # Дата и время разбираются в published_at, как у политики/науки/здоровья; лента - от новых к старым
+    result['news'] = normalize_items(news)
+    return result
+
+def _extract_listing(site, encoding='utf-8', limit=None):
+    """extract для _fetch: страница целиком"""
+    def extract(response):
+        news = SITES[site].extract(make_tree(response, encoding), response.url)
+        return {'news': news[:limit] if limit else news}
+    return extract
+
+def _extract_listing_stream(site, encoding, limit):
+    """extract для _fetch(stream=True): чтение прекращается после первых limit новостей"""
+    def extract(response):
+        try:
+            return {'news': SITES[site].extract_stream(
+                response.iter_content(CHUNK_SIZE), response.url, limit=limit, encoding=encoding
+            )}
+        finally:
+            response.close()
+    return extract
 
-        if not (title_tag and date_tag and img_tag and link_tag):
-            continue
 
-        date_time_str = date_tag.text.strip()
-        if ',' in date_time_str:
-            date, time = map(str.strip, date_time_str.split(',', 1))
-        else:
-            date, time = date_time_str, ''
+"""
+===============================
+===          SPORT          ===
+===============================
+"""
 
-        news_dict['news'].append({
-            'title': title_tag.text.strip(),
-            'date': date,
-            'time': time,
-            'image': img_tag['src'],
-            'link': link_tag['href']
-        })
+def parse_main_news_sport(url, limit=None):
+    return _fetch_listing(url, 'sport.ru main', 'windows-1251', limit)
 
-    return news_dict
+def parse_latest_news_sport(url, limit=None):
+    return _fetch_listing(url, 'sport.ru', 'windows-1251', limit)
 
 def get_full_article_text_sport(url):
-    response = requests.get(url)
+    return _fetch_article(url, _extract_full_article_text_sport)
+
+def get_full_article_texts_sport(urls):
+    return fetch_batch(urls, get_full_article_text_sport, default='')
+
+def _extract_full_article_text_sport(response):
     response.encoding = 'windows-1251'
     soup = BeautifulSoup(response.text, 'lxml')
 
@@ -125,63 +153,16 @@ def get_full_article_text_sport(url):
 ===============================
 """
 
-RU_MONTHS = {
-    'января': '01',
-    'февраля': '02',
-    'марта': '03',
-    'апреля': '04',
-    'мая': '05',
-    'июня': '06',
-    'июля': '07',
-    'августа': '08',
-    'сентября': '09',
-    'октября': '10',
-    'ноября': '11',
-    'декабря': '12',
-}
+def parse_latest_news_education(url_base, limit=None):
+    return _fetch_listing(url_base, 'k-obr.spb.ru', limit=limit)
 
-def parse_latest_news_education(url_base):
-    response = requests.get(url_base)
-    response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'lxml')
+def get_full_article_text_education(url):
+    return _fetch_article(url, _extract_full_article_text_education)
 
-    news_dict = {'news': []}
-    items = soup.select('div.news__item.card')
-
-    for item in items:
-        title_tag = item.select_one('h2.news__title a')
-        link_tag = item.select_one('a.news__link')
-        date_parts = item.select('div.news__date .d-inline')
-
-        if not (title_tag and link_tag and date_parts and len(date_parts) >= 3):
-            continue
-
-        day = date_parts[0].get_text(strip=True)
-        month_ru = date_parts[1].get_text(strip=True).lower()
-        year = date_parts[2].get_text(strip=True)
-        month = RU_MONTHS.get(month_ru, '01')
-        date = f'{day.zfill(2)}.{month}.{year}'
-
-        style = link_tag.get('style', '')
-        image = ''
-        if "background-image" in style:
-            start = style.find("url(")
-            end = style.find(")", start + 4)
-            if start != -1 and end != -1:
-                image = style[start + 4:end].strip().strip('"').strip("'")
-
-        news_dict['news'].append({
-            'title': title_tag.get_text(strip=True),
-            'date': date,
-            'time': '',
-            'image': image,
-            'link': title_tag['href']
-        })
-
-    return news_dict
+def get_full_article_texts_education(urls):
+    return fetch_batch(urls, get_full_article_text_education, default='')
 
-def get_full_article_text_education(url):
-    response = requests.get(url)
+def _extract_full_article_text_education(response):
     response.encoding = 'utf-8'
     soup = BeautifulSoup(response.text, 'lxml')
 
@@ -198,68 +179,16 @@ def get_full_article_text_education(url):
 ===============================
 """
 
-def parse_latest_news_it(url):
-    response = requests.get(url)
-    response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'lxml')
-
-    news = {'news': []}
-    items = soup.select('article.tm-articles-list__item, article.tm-articles-listitem')
-
-    for item in items:
-        title_tag = item.select_one('h2.tm-title a.tm-title__link, h2.tm-title a.tm-titlelink')
-        time_tag = item.select_one('a.tm-article-datetime-published time, time.tm-article-datetime-published')
-        img_tag = item.select_one('img.tm-article-snippet__lead-image, img.tm-article-snippetlead-image')
-        if not title_tag:
-            # Альтернативная разметка карточки
-            title_tag = item.select_one('a[data-test-id="article-snippet-title-link"]')
-        if not (title_tag and time_tag):
-            continue
-
-        title = title_tag.get_text(strip=True)
-        link = title_tag.get('href', '')
-        if link and link.startswith('/'):
-            # Habr: относительная ссылка
-            link = 'https://habr.com' + link
-
-        # Время берём из атрибута title или datetime
-        date = ''
-        time = ''
-        dt_title = time_tag.get('title')
-        dt_attr = time_tag.get('datetime')
-        dt_text = (dt_title or dt_attr or '').strip()
-        if dt_text:
-            # Форматы типа "2025-10-01, 07:13" или ISO
-            if ',' in dt_text:
-                d, t = dt_text.split(',', 1)
-                date, time = d.strip(), t.strip()
-            elif 'T' in dt_text and 'Z' in dt_text:
-                # ISO: 2025-10-01T07:13:26.000Z
-                iso = dt_text.replace('Z', '')
-                parts = iso.split('T', 1)
-                if len(parts) == 2:
-                    date, time = parts[0], parts[1][:5]
-            else:
-                date = dt_text
-
-        image = ''
-        if img_tag and img_tag.get('src'):
-            image = img_tag['src']
-            if image.startswith('//'):
-                image = 'https:' + image
-
-        news['news'].append({
-            'title': title,
-            'date': date,
-            'time': time,
-            'image': image,
-            'link': link
-        })
-
-    return news
+def parse_latest_news_it(url, limit=None):
+    return _fetch_listing(url, 'habr.com', limit=limit)
 
 def get_full_article_text_it(url):
-    response = requests.get(url)
+    return _fetch_article(url, _extract_full_article_text_it)
+
+def get_full_article_texts_it(urls):
+    return fetch_batch(urls, get_full_article_text_it, default='')
+
+def _extract_full_article_text_it(response):
     response.encoding = 'utf-8'
     soup = BeautifulSoup(response.text, 'lxml')
 
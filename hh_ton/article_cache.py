@@ -0,0 +1,235 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from url_canon import canonical_url
+
+
+def _env_number(name: str, default, cast=float):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Сколько статей держим в памяти и сколько секунд текст считается свежим без запроса к сайту
+DEFAULT_MAX_ENTRIES = _env_number('ARTICLE_CACHE_SIZE', 2000, int)
+DEFAULT_TTL = _env_number('ARTICLE_CACHE_TTL', 900)
+
+# Сохранение между перезапусками включается переменной ARTICLE_CACHE_PATH (путь к файлу SQLite)
+ARTICLE_CACHE_PATH = os.environ.get('ARTICLE_CACHE_PATH', '')
+
+def content_hash(data) -> str:
+    """Короткий хэш содержимого (байты страницы или текст статьи)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data or b'', digest_size=16).hexdigest()
+
+
+class ArticleCache:
+    """
+    LRU-кэш извлечённых текстов статей и превью.
+    Ключ - канонический URL (url_canon) и вариант ('text:1', 'preview:300' и т.п.).
+    Пока запись свежая (ttl), к сайту не обращаемся вовсе; после - страница скачивается,
+    но если хэш тела не изменился, текст не извлекается заново.
+    Превью привязано к хэшу текста, из которого посчитано.
+    path - файл SQLite, чтобы кэш переживал перезапуск (в памяти остаются последние max_entries).
+    Подписчики (subscribe) получают каждый новый или изменившийся текст - например, поисковый индекс
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'unchanged': 0, 'stores': 0, 'evictions': 0, 'disk_hits': 0}
+        self._listeners = []
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS articles (
+                    key TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    text TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS articles_accessed ON articles (accessed_at)')
+            self._conn.commit()
+
+    @staticmethod
+    def key(url: str, variant: str) -> str:
+        return f'{variant}|{canonical_url(url)}'
+
+    def _entry(self, key: str) -> Optional[Dict]:
+        """Запись из памяти или с диска (поднимается в память). Вызывается под блокировкой"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._conn is None:
+            return None
+
+        row = self._conn.execute(
+            'SELECT content_hash, text, stored_at FROM articles WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._counters['disk_hits'] += 1
+        self._conn.execute('UPDATE articles SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        self._conn.commit()
+        entry = {'hash': row[0], 'text': row[1], 'stored_at': row[2]}
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def get(self, url: str, variant: str) -> Optional[str]:
+        """Свежий текст из кэша или None"""
+        key = self.key(url, variant)
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None or time.time() - entry['stored_at'] > self.ttl:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            return entry['text']
+
+    def put(self, url: str, variant: str, text: str, digest: Optional[str] = None):
+        """Сохраняет непустой текст; digest - хэш содержимого, из которого он извлечён"""
+        if not text:
+            return
+        key = self.key(url, variant)
+        now = time.time()
+        with self._lock:
+            self._remember(key, {'hash': digest, 'text': text, 'stored_at': now})
+            self._counters['stores'] += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO articles (key, content_hash, text, stored_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, digest, text, now, now)
+                )
+                self._evict_disk()
+                self._conn.commit()
+        for listener in self._listeners:
+            try:
+                listener(url, variant, text)
+            except Exception as e:
+                print(f"💥 Ошибка подписчика кэша статей для {url}: {e}")
+
+    def subscribe(self, listener: Callable[[str, str, str], None]):
+        """listener(url, variant, text) вызывается после сохранения каждого текста"""
+        self._listeners.append(listener)
+
+    def touch(self, url: str, variant: str):
+        """Сайт подтвердил актуальность (например, ответом 304) - запись снова свежая"""
+        key = self.key(url, variant)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['stored_at'] = now
+            if self._conn is not None:
+                self._conn.execute(
+                    'UPDATE articles SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key)
+                )
+                self._conn.commit()
+
+    def _unchanged(self, key: str, digest: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None or entry['hash'] != digest:
+                return None
+            entry['stored_at'] = time.time()
+            self._counters['unchanged'] += 1
+            return entry['text']
+
+    def extractor(self, url: str, variant: str,
+                  extract: Callable[[requests.Response], str]) -> Callable[[requests.Response], str]:
+        """
+        Обёртка extract для revalidation: если тело страницы совпадает по хэшу с прошлым,
+        возвращается сохранённый текст без разбора
+        """
+        key = self.key(url, variant)
+
+        def cached_extract(response: requests.Response) -> str:
+            digest = content_hash(response.content)
+            text = self._unchanged(key, digest)
+            if text is not None:
+                print(f"♻️ Содержимое не изменилось: {url}")
+                return text
+            text = extract(response)
+            if response.status_code == 200:
+                self.put(url, variant, text, digest)
+            return text
+
+        return cached_extract
+
+    def derive(self, url: str, variant: str, source: str, compute: Callable[[str], str]) -> str:
+        """Значение, вычисляемое из текста (превью): пересчитывается, только если текст изменился"""
+        digest = content_hash(source)
+        text = self._unchanged(self.key(url, variant), digest)
+        if text is None:
+            text = compute(source)
+            self.put(url, variant, text, digest)
+        return text
+
+    def derive_many(self, items: List[Tuple[str, str]], variant: str,
+                    compute_many: Callable[[List[str]], List[str]]) -> List[str]:
+        """
+        derive для пачки пар (url, текст): тексты, которые не изменились, берутся из кэша,
+        остальные считаются одним вызовом compute_many (пакетное превью)
+        """
+        digests = [content_hash(source) for _, source in items]
+        results = [self._unchanged(self.key(url, variant), digest) for (url, _), digest in zip(items, digests)]
+        missing = [i for i, text in enumerate(results) if text is None]
+        computed = compute_many([items[i][1] for i in missing]) if missing else []
+        for i, text in zip(missing, computed):
+            results[i] = text
+            self.put(items[i][0], variant, text, digests[i])
+        return results
+
+    def _evict_disk(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM articles WHERE key IN (SELECT key FROM articles ORDER BY accessed_at LIMIT ?)',
+                (excess,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM articles')
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            if self._conn is not None:
+                stats['disk_entries'] = self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        return stats
+
+
+# Общий кэш статей для всех парсеров
+default_article_cache = ArticleCache(path=ARTICLE_CACHE_PATH or None)
@@ -0,0 +1,90 @@
+import re
+from typing import Iterable, List
+
+
+# Признаки оглавления: подстроки в любом месте строки
+TOC_INDICATORS = (
+    'оглавление', 'содержание', 'содержит', 'в статье',
+    'читайте также', 'table of contents', 'toc',
+    'введение', 'заголовок', 'раздел', 'часть', 'глава'
+)
+
+# Одно регулярное выражение вместо цикла по подстрокам и пяти re.search:
+# нумерация '1. ' / 'iv. ' в начале первой строки или любой из признаков.
+# Шаблоны 'раздел N', 'часть N', 'глава N' уже покрыты признаками 'раздел', 'часть', 'глава'.
+# [^\S\n] - пробельный символ, но не перевод строки: нумерация ищется только в первой строке
+TOC_PATTERN = re.compile(
+    r'^(?:\d+|[ivx]+)\.[^\S\n]|' + '|'.join(re.escape(indicator) for indicator in TOC_INDICATORS)
+)
+
+# Строки короче этого не считаются оглавлением, а длиннее - считаются началом текста
+TOC_MIN_LENGTH = 50
+
+
+def is_table_of_contents(text: str) -> bool:
+    """Определяет, является ли текст оглавлением"""
+    text_lower = text.lower().strip()
+    if len(text_lower) < TOC_MIN_LENGTH:
+        return False
+    return TOC_PATTERN.search(text_lower) is not None
+
+
+def _iter_lines(text: str):
+    """Строки по '\\n' без разбиения всего текста: превью обычно заканчивается в начале статьи"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def extract_news_preview(text: str, preview_length: int = 300) -> str:
+    """Превью новости: текст с первой длинной строки, не похожей на оглавление"""
+    news_lines = []
+
+    skip_toc = True
+    joined_length = -1
+    for line in _iter_lines(text):
+        line = line.strip()
+        if not line:
+            continue
+
+        if skip_toc:
+            if len(line) <= TOC_MIN_LENGTH or is_table_of_contents(line):
+                continue
+            skip_toc = False
+
+        news_lines.append(line)
+        # Текст дальше preview_length символов в превью всё равно не попадёт
+        joined_length += len(line) + 1
+        if joined_length > preview_length:
+            break
+
+    if not news_lines:
+        news_lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    preview_text = ' '.join(news_lines)
+
+    if len(preview_text) > preview_length:
+        preview_text = preview_text[:preview_length]
+        last_space = preview_text.rfind(' ')
+        if last_space > preview_length * 0.7:
+            preview_text = preview_text[:last_space]
+        preview_text += '...'
+
+    return preview_text
+
+
+def extract_news_previews(texts: Iterable[str], preview_length: int = 300) -> List[str]:
+    """Превью для пачки статей за один вызов; одинаковые тексты обрабатываются один раз"""
+    previews = {}
+    result = []
+    for text in texts:
+        preview = previews.get(text)
+        if preview is None:
+            preview = previews[text] = extract_news_preview(text, preview_length)
+        result.append(preview)
+    return result
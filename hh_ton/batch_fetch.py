@@ -0,0 +1,54 @@
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+from politeness import HostRateLimiter
+
+
+# Всего потоков на пакет и сколько запросов к одному хосту идут одновременно
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PER_HOST = 2
+
+
+def fetch_batch(urls: Iterable[str], fetch: Callable[[str], Any],
+                max_workers: int = DEFAULT_MAX_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                default: Any = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Пакетная загрузка: fetch(url) для каждого URL в ограниченном пуле потоков.
+    Одновременно к одному хосту - не больше per_host запросов, хосты чередуются,
+    поэтому медленный сайт не занимает все потоки.
+    Пары (url, результат) отдаются по мере готовности; при исключении результат - default.
+    Повторяющиеся URL загружаются один раз
+    """
+    queues = OrderedDict()
+    for url in dict.fromkeys(urls):
+        queues.setdefault(HostRateLimiter.host_of(url), deque()).append(url)
+    if not queues:
+        return
+
+    running = {}
+    active = Counter()
+    workers = max(1, min(max_workers, sum(len(queue) for queue in queues.values())))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-fetch') as executor:
+        def submit_ready():
+            for host, queue in queues.items():
+                while queue and active[host] < per_host and len(running) < workers:
+                    url = queue.popleft()
+                    active[host] += 1
+                    running[executor.submit(fetch, url)] = (url, host)
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, host = running.pop(future)
+                active[host] -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Ошибка пакетной загрузки {url}: {e}")
+                    result = default
+                yield url, result
+            submit_ready()
+
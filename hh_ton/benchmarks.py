@@ -0,0 +1,735 @@
+"""
+Бенчмарки парсеров. Запуск из папки hh_ton:
+
+    python benchmarks.py selenium [URL ...]   - профили браузера full и scrape на страницах РИА/ТАСС/Интерфакс
+    python benchmarks.py importtime           - время импорта main.py по `python -X importtime`
+    python benchmarks.py parse [--download]   - разбор сохранённых страниц списков: BeautifulSoup + select_one
+                                                против lxml + скомпилированных описаний источников (site_specs)
+    python benchmarks.py text [URL ...]       - текст статей: prettify + повторный разбор против обхода в один проход
+    python benchmarks.py memory               - память на 100k новостей: словари против NewsItem со __slots__
+    python benchmarks.py preview              - превью статей: прежний поиск оглавления (12 подстрок + 5 re.search
+                                                на строку) против одного скомпилированного выражения и пакетного вызова
+    python benchmarks.py stem                 - проверка стеммера поиска: падежные формы существительного дают одну основу,
+                                                и статья находится по любой из них
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+SELENIUM_URLS = [
+    'https://ria.ru/politics/',
+    'https://tass.ru/politika',
+    'https://www.interfax.ru/politics/',
+]
+
+
+def _print_table(header, rows):
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+
+# ===== SELENIUM: ПРОФИЛИ БРАУЗЕРА =====
+
+def _measure_page(parser, driver, url):
+    started = time.perf_counter()
+    driver.get(url)
+    parser._wait_until_ready(driver, parser._listing_selectors(url))
+    html = parser._read_page_source(driver)
+    elapsed = time.perf_counter() - started
+
+    metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+    transferred = driver.execute_script(
+        "return performance.getEntriesByType('resource')"
+        ".reduce((sum, e) => sum + (e.transferSize || 0), 0);"
+    )
+    return {
+        'seconds': elapsed,
+        'heap_mb': metrics.get('JSHeapUsedSize', 0) / 1024 / 1024,
+        'transferred_kb': (transferred or 0) / 1024,
+        'html_kb': len(html) / 1024,
+    }
+
+
+def bench_selenium(urls, repeats):
+    import Parsing_politics_science_health as PSH
+
+    parser = PSH.AdvancedNewsParser()
+    rows = []
+    for profile in ('full', 'scrape'):
+        parser.browser_profile = profile
+        driver = parser.get_selenium_driver(profile)
+        driver.execute_cdp_cmd('Performance.enable', {})
+        try:
+            for url in urls:
+                runs = [_measure_page(parser, driver, url) for _ in range(repeats)]
+                rows.append([
+                    profile,
+                    url,
+                    f"{statistics.median(r['seconds'] for r in runs):.2f}",
+                    f"{statistics.median(r['heap_mb'] for r in runs):.1f}",
+                    f"{statistics.median(r['transferred_kb'] for r in runs):.0f}",
+                    f"{statistics.median(r['html_kb'] for r in runs):.0f}",
+                ])
+        finally:
+            driver.quit()
+
+    _print_table(['профиль', 'url', 'сек', 'heap МБ', 'скачано КБ', 'html КБ'], rows)
+
+
+# ===== РАЗБОР СТРАНИЦ СПИСКОВ =====
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_pages')
+
+# Имя сохранённой страницы начинается с источника: ria_politics.html, tass_politika.html...
+PAGE_SOURCES = {
+    'ria': 'https://ria.ru/politics/',
+    'tass': 'https://tass.ru/politika',
+    'interfax': 'https://www.interfax.ru/politics/',
+    'doctorpiter': 'https://doctorpiter.ru/news/',
+}
+
+
+def _download_pages(pages_dir):
+    from http_client import get_session
+
+    os.makedirs(pages_dir, exist_ok=True)
+    session = get_session()
+    for name, url in PAGE_SOURCES.items():
+        response = session.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        response.raise_for_status()
+        path = os.path.join(pages_dir, f'{name}_listing.html')
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"💾 {url} -> {path} ({len(response.content) / 1024:.0f} КБ)")
+
+
+def _page_response(path, url):
+    import requests
+
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    with open(path, 'rb') as f:
+        response._content = f.read()
+    return response
+
+
+def _soup_field(item, spec, base_url, page_url):
+    """Эталон для CompiledField: то же описание поля, вычисленное через BeautifulSoup select/select_one"""
+    from url_canon import absolute_url
+
+    if 'value' in spec:
+        return spec['value']() if callable(spec['value']) else spec['value']
+
+    def element_value(element):
+        attrs = spec.get('attr')
+        if attrs is None:
+            return element.get_text(strip=True) if spec.get('text') == 'parts' else element.get_text().strip()
+        for attr in [attrs] if isinstance(attrs, str) else attrs:
+            if element.get(attr):
+                return element.get(attr)
+        return ''
+
+    value = None
+    candidates = spec.get('css') if isinstance(spec.get('css'), list) else [spec.get('css')]
+    for selector in candidates:
+        elements = item.select(selector) if selector else [item]
+        if not elements:
+            continue
+        if spec.get('all'):
+            value = [element_value(element) for element in elements]
+            break
+        value = element_value(elements[0])
+        if value or spec.get('attr') is None:
+            break
+        value = None
+    if value is None and spec.get('fallback'):
+        value = _soup_field(item, spec['fallback'], base_url, page_url)
+    if value not in (None, '', []) and spec.get('parse'):
+        value = spec['parse'](value)
+
+    if isinstance(value, str) and value and not spec.get('into'):
+        if spec.get('url'):
+            value = absolute_url(value, base_url, page_url)
+        if spec.get('contains') and spec['contains'] not in value:
+            value = ''
+        if spec.get('min_len') and len(value) < spec['min_len'] or spec.get('max_len') and len(value) > spec['max_len']:
+            value = ''
+        if value and spec.get('truncate') and len(value) > spec['truncate']:
+            value = value[:spec['truncate']] + "..."
+    return value
+
+
+def _soup_extract(soup, spec, page_url, values=None):
+    """Новости по описанию источника через BeautifulSoup - так работали рукописные экстракторы"""
+    selectors = spec['items'] if isinstance(spec['items'], list) else [spec['items']]
+    base_url = spec.get('base_url', '')
+    news_items, seen = [], set()
+
+    def collect(elements):
+        for element in elements[:spec.get('limit')]:
+            news_item = {}
+            for name, field in spec['fields'].items():
+                if values and name in values:
+                    news_item[name] = values[name]
+                    continue
+                value = _soup_field(element, field, base_url, page_url)
+                required = field.get('required', 'default' not in field and 'value' not in field)
+                if value in (None, '', []):
+                    if required:
+                        break
+                    value = field['default']() if callable(field.get('default')) else field.get('default', '')
+                if field.get('into'):
+                    news_item.update(zip(field['into'], value))
+                else:
+                    news_item[name] = value
+            else:
+                key = news_item.get(spec.get('unique'))
+                if spec.get('unique') and key in seen:
+                    continue
+                seen.add(key)
+                news_items.append(news_item)
+
+    if spec.get('strategy') == 'union':
+        collect([element for selector in selectors for element in soup.select(selector)])
+        return news_items
+    for selector in selectors:
+        collect(soup.select(selector))
+        if len(news_items) >= spec.get('min_items', 1):
+            break
+    return news_items
+
+
+def _measure_parse(parse, extract, repeats):
+    """Медиана времени разбора+извлечения, пик памяти tracemalloc и найденные новости"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        items = extract(parse())
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    extract(parse())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, items
+
+
+def bench_parse(pages_dir, repeats, download):
+    from bs4 import BeautifulSoup
+    import Parsing_politics_science_health as PSH
+    from html_parsing import make_tree
+    from site_specs import SITE_SPECS, SITES
+
+    if download:
+        _download_pages(pages_dir)
+
+    pages = sorted(name for name in os.listdir(pages_dir) if name.endswith('.html')) if os.path.isdir(pages_dir) else []
+    if not pages:
+        print(f"❌ Нет сохранённых страниц в {pages_dir} (запустите с --download)")
+        return 1
+
+    parser = PSH.AdvancedNewsParser()
+    rows = []
+    mismatched = False
+    for name in pages:
+        url = PAGE_SOURCES.get(name.split('_')[0].split('.')[0])
+        if not url:
+            print(f"⚠️ Пропускаем {name}: имя должно начинаться с одного из {', '.join(PAGE_SOURCES)}")
+            continue
+        response = _page_response(os.path.join(pages_dir, name), url)
+        site = parser._extract_source_name(url)
+
+        old = _measure_parse(lambda: BeautifulSoup(response.text, 'html.parser'),
+                             lambda soup: _soup_extract(soup, SITE_SPECS[site], url), repeats)
+        new = _measure_parse(lambda: make_tree(response), lambda root: SITES[site].extract(root, url), repeats)
+
+        mismatched |= old[2] != new[2]
+        rows.append([
+            name,
+            f"{len(response.content) / 1024:.0f}",
+            f"{old[0] * 1000:.1f}", f"{new[0] * 1000:.1f}", f"{old[0] / new[0]:.1f}x",
+            f"{old[1] / 1024 / 1024:.1f}", f"{new[1] / 1024 / 1024:.1f}",
+            f"{len(old[2])}/{len(new[2])}",
+        ])
+
+    _print_table(['страница', 'КБ', 'bs4 мс', 'lxml+XPath мс', 'ускорение',
+                  'пик МБ (было)', 'пик МБ (стало)', 'новостей'], rows)
+    print("ℹ️ tracemalloc видит только память Python: дерево libxml2 в пик 'стало' не входит")
+    if mismatched:
+        print("❌ Новости различаются между BeautifulSoup и скомпилированными описаниями")
+        return 1
+    return 0
+
+
+# ===== ТЕКСТ СТАТЕЙ =====
+
+ARTICLES_DIR = os.path.join(PAGES_DIR, 'articles')
+
+
+def _legacy_formatted_text(content_div):
+    """Прежний _extract_formatted_text: prettify, повторный разбор и несколько проходов find_all"""
+    import re
+    from bs4 import BeautifulSoup
+
+    temp_div = BeautifulSoup(content_div.prettify(), 'html.parser')
+
+    for tag in temp_div.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        tag.insert_after('\n\n')
+        tag.insert_before('\n\n')
+
+    for tag in temp_div.find_all('p'):
+        tag.insert_after('\n\n')
+
+    for tag in temp_div.find_all(['ul', 'ol']):
+        tag.insert_after('\n')
+        for li in tag.find_all('li'):
+            li.insert_after('\n')
+
+    for tag in temp_div.find_all('div'):
+        if tag.get_text(strip=True):
+            child_tags = tag.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol'])
+            if not child_tags:
+                tag.insert_after('\n')
+
+    text = temp_div.get_text()
+
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            lines.append(line)
+
+    formatted_text = '\n'.join(lines)
+    formatted_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', formatted_text)
+
+    return formatted_text.strip()
+
+
+def _download_articles(urls, articles_dir):
+    from http_client import get_session
+
+    os.makedirs(articles_dir, exist_ok=True)
+    session = get_session()
+    for url in urls:
+        response = session.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        response.raise_for_status()
+        name = ('ria_' if 'ria.ru' in url else '') + url.rstrip('/').rsplit('/', 1)[-1].replace('.html', '') + '.html'
+        with open(os.path.join(articles_dir, name), 'wb') as f:
+            f.write(response.content)
+        print(f"💾 {url} -> {name}")
+
+
+def bench_text(articles_dir, urls, repeats):
+    import Parsing_politics_science_health as PSH
+    from html_parsing import make_soup, text_lines
+
+    if urls:
+        _download_articles(urls, articles_dir)
+
+    pages = sorted(name for name in os.listdir(articles_dir) if name.endswith('.html')) if os.path.isdir(articles_dir) else []
+    if not pages:
+        print(f"❌ Нет сохранённых статей в {articles_dir} (передайте URL статей)")
+        return 1
+
+    parser = PSH.AdvancedNewsParser()
+    rows = []
+    mismatched = False
+    for name in pages:
+        # Имя ria_* - статья РИА (свои селекторы текста), остальные - общие селекторы
+        selectors = parser.RIA_ARTICLE_CONTENT_SELECTORS if name.startswith('ria') else parser.ARTICLE_CONTENT_SELECTORS
+        response = _page_response(os.path.join(articles_dir, name), '')
+        soup = make_soup(response)
+        content_div = next((soup.select_one(selector) for selector in selectors if soup.select_one(selector)), None)
+        if content_div is None:
+            print(f"⚠️ {name}: текст статьи не найден")
+            continue
+        for elem in content_div.select(parser.UNWANTED_ARTICLE_SELECTOR):
+            elem.decompose()
+
+        timings = {}
+        texts = {}
+        for label, extract in (('old', _legacy_formatted_text), ('new', text_lines)):
+            runs = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                texts[label] = extract(content_div)
+                runs.append(time.perf_counter() - started)
+            timings[label] = statistics.median(runs)
+
+        same = texts['old'] == texts['new']
+        mismatched |= not same
+        rows.append([
+            name, f"{len(texts['new']) / 1024:.1f}",
+            f"{timings['old'] * 1000:.2f}", f"{timings['new'] * 1000:.2f}",
+            f"{timings['old'] / timings['new']:.0f}x", 'да' if same else 'НЕТ',
+        ])
+
+    _print_table(['статья', 'текст КБ', 'prettify мс', 'один проход мс', 'ускорение', 'совпадает'], rows)
+    if mismatched:
+        print("❌ Текст отличается от прежнего _extract_formatted_text")
+        return 1
+    return 0
+
+
+# ===== ПРЕВЬЮ СТАТЕЙ =====
+
+def _legacy_is_table_of_contents(text):
+    """Прежний _is_table_of_contents"""
+    import re
+
+    toc_indicators = [
+        'оглавление', 'содержание', 'содержит', 'в статье',
+        'читайте также', 'table of contents', 'toc',
+        'введение', 'заголовок', 'раздел', 'часть', 'глава'
+    ]
+
+    text_lower = text.lower().strip()
+    if len(text_lower) < 50:
+        return False
+
+    for indicator in toc_indicators:
+        if indicator in text_lower:
+            return True
+
+    toc_patterns = [
+        r'^\d+\.\s',
+        r'^[ivx]+\.\s',
+        r'^раздел\s+\d+',
+        r'^часть\s+\d+',
+        r'^глава\s+\d+',
+    ]
+
+    first_line = text_lower.split('\n')[0] if '\n' in text_lower else text_lower
+    for pattern in toc_patterns:
+        if re.search(pattern, first_line):
+            return True
+
+    return False
+
+
+def _legacy_news_preview(text, preview_length=300):
+    """Прежний _extract_news_preview"""
+    lines = text.split('\n')
+    news_lines = []
+
+    skip_toc = True
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if skip_toc:
+            if _legacy_is_table_of_contents(line):
+                continue
+            if len(line) > 50 and not _legacy_is_table_of_contents(line):
+                skip_toc = False
+                news_lines.append(line)
+        else:
+            news_lines.append(line)
+
+    if not news_lines:
+        news_lines = [line.strip() for line in lines if line.strip()]
+
+    preview_text = ' '.join(news_lines)
+
+    if len(preview_text) > preview_length:
+        preview_text = preview_text[:preview_length]
+        last_space = preview_text.rfind(' ')
+        if last_space > preview_length * 0.7:
+            preview_text = preview_text[:last_space]
+        preview_text += '...'
+
+    return preview_text
+
+
+def _synthetic_articles(count):
+    """Статьи с оглавлениями, нумерацией, короткими строками и длинным телом - для проверки совпадения"""
+    import random
+
+    rng = random.Random(19)
+    heads = [
+        'Оглавление статьи о реформе образования и её последствиях для регионов',
+        '1. Введение в проблему и краткая история вопроса для читателей издания',
+        'iv. Четвёртая часть подробного обзора рынка и прогнозы аналитиков на год',
+        'IV.\tРимская нумерация с табуляцией после точки в строке оглавления статьи',
+        '12.Без пробела после точки - это уже не нумерация, а обычная длинная строка',
+        'Раздел 3 посвящён вопросам финансирования программы и распределения средств',
+        'Читайте также: другие материалы рубрики о здоровье и медицине в России',
+        'Кратко',
+        '٣. Номер арабско-индийской цифрой и длинный текст после него для проверки',
+        'TOC: список разделов публикации на сайте с указанием страниц и авторов',
+    ]
+    words = ('правительство заявило что новые меры поддержки вступят в силу уже '
+             'в следующем месяце а эксперты оценивают их эффект как умеренный').split()
+    articles = []
+    for _ in range(count):
+        lines = rng.sample(heads, rng.randint(0, 5))
+        for _ in range(rng.randint(1, 60)):
+            lines.append(' '.join(rng.choice(words) for _ in range(rng.randint(2, 40))))
+            if rng.random() < 0.2:
+                lines.append('')
+        articles.append('\n'.join(lines))
+    return articles
+
+
+def bench_preview(articles_dir, count, repeats, preview_length):
+    from article_preview import extract_news_preview, extract_news_previews
+    from html_parsing import make_soup, text_lines
+
+    texts = _synthetic_articles(count)
+    pages = sorted(name for name in os.listdir(articles_dir) if name.endswith('.html')) if os.path.isdir(articles_dir) else []
+    for name in pages:
+        texts.append(text_lines(make_soup(_page_response(os.path.join(articles_dir, name), '')).body))
+
+    old = [_legacy_news_preview(text, preview_length) for text in texts]
+    new = [extract_news_preview(text, preview_length) for text in texts]
+    batch = extract_news_previews(texts, preview_length)
+    mismatches = sum(a != b for a, b in zip(old, new)) + sum(a != b for a, b in zip(old, batch))
+
+    rows = []
+    timings = {}
+    for label, run in (
+        ('прежний', lambda: [_legacy_news_preview(text, preview_length) for text in texts]),
+        ('скомпилированный', lambda: [extract_news_preview(text, preview_length) for text in texts]),
+        ('пакетный', lambda: extract_news_previews(texts, preview_length)),
+    ):
+        runs = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run()
+            runs.append(time.perf_counter() - started)
+        timings[label] = statistics.median(runs)
+        rows.append([label, f"{timings[label] * 1000:.1f}", f"{timings['прежний'] / timings[label]:.1f}x"])
+
+    print(f"Статей: {len(texts)} (сохранённых: {len(pages)}), длина превью: {preview_length}")
+    _print_table(['вариант', 'мс на все', 'ускорение'], rows)
+    if mismatches:
+        print(f"❌ Превью отличается от прежнего _extract_news_preview: {mismatches}")
+        return 1
+    print("✅ Превью совпадают")
+    return 0
+
+
+# ===== СТЕММЕР ПОИСКА =====
+
+# Падежные формы одного слова: у каждой группы должна быть одна основа
+STEM_GROUPS = [
+    ['бюджет', 'бюджета', 'бюджету', 'бюджетом', 'бюджете', 'бюджеты', 'бюджетов'],
+    ['депутат', 'депутата', 'депутату', 'депутатом', 'депутаты', 'депутатов', 'депутатами'],
+    ['совет', 'совета', 'совету', 'советом', 'совете', 'советы', 'советов'],
+    ['результат', 'результата', 'результатом', 'результаты', 'результатов', 'результатами'],
+    ['президент', 'президента', 'президенту', 'президентом', 'президенте'],
+    ['закон', 'закона', 'закону', 'законом', 'законе', 'законы', 'законов'],
+    ['выборы', 'выборов', 'выборам', 'выборами', 'выборах'],
+    ['ёлка', 'елки', 'ёлке', 'ёлку', 'ёлкой'],
+]
+
+
+def _stem_mismatches(stem):
+    mismatches = []
+    for group in STEM_GROUPS:
+        stems = {word: stem(word) for word in group}
+        if len(set(stems.values())) > 1:
+            mismatches.append(stems)
+    return mismatches
+
+
+def bench_stem():
+    import news_search
+    from news_search import NewsSearchIndex, stem
+
+    failed = False
+    stemmers = [('основной' if news_search._russian_stemmer() else 'запасной (нет snowballstemmer)', stem),
+                ('запасной', lambda word: news_search._light_stem(word.lower().replace('ё', 'е')))]
+    for label, stem_word in stemmers:
+        mismatches = _stem_mismatches(stem_word)
+        for stems in mismatches:
+            print(f"❌ {label}: разные основы у форм одного слова: {stems}")
+        failed = failed or bool(mismatches)
+
+    # Статья находится по любой форме слова из её текста
+    index = NewsSearchIndex()
+    for number, group in enumerate(STEM_GROUPS):
+        url = f'https://example.com/{number}'
+        index.index_article(url, f'В статье есть слово {group[0]}.')
+        index.ingest('politics', [{'title': f'Новость {number}', 'link': url}])
+    missed = [word for number, group in enumerate(STEM_GROUPS) for word in group
+              if not any(item['link'] == f'https://example.com/{number}' for item in index.search(word))]
+    if missed:
+        print(f"❌ Поиск не находит статью по формам: {', '.join(missed)}")
+        failed = True
+
+    started = time.perf_counter()
+    words = [word for group in STEM_GROUPS for word in group] * 1000
+    for word in words:
+        stem(word)
+    print(f"Стемминг: {len(words)} слов за {(time.perf_counter() - started) * 1000:.1f} мс")
+    if failed:
+        return 1
+    print("✅ Формы слов дают одну основу, поиск находит статьи по любой форме")
+    return 0
+
+
+# ===== ПАМЯТЬ НА НОВОСТИ =====
+
+SOURCES = ('RIA.ru', 'TASS', 'Интерфакс', 'Доктор Питер', 'habr.com')
+CATEGORIES = ('politics', 'science', 'health', 'it', 'sport', 'education')
+
+
+def _news_fields(count):
+    """Поля новостей, как их отдают парсеры: каждая строка - отдельный объект"""
+    for i in range(count):
+        # ''.join - новые объекты строк, как после разбора страницы (а не общие константы)
+        yield {
+            'title': f'Заголовок новости номер {i} о важных событиях дня',
+            'date': f'{i % 28 + 1:02d}.10.2025',
+            'time': f'{i % 24:02d}:{i % 60:02d}',
+            'image': f'https://cdn.example.ru/img/{i}.jpg',
+            'link': f'https://example.ru/news/{i}.html',
+            'source': ''.join(SOURCES[i % len(SOURCES)]),
+            'description': f'Краткое описание новости {i}' if i % 3 == 0 else '',
+            'category': ''.join(CATEGORIES[i % len(CATEGORIES)]),
+            'published_at': 1760000000 + i,
+        }
+
+
+def _measure_items(build, count):
+    import copy
+    import gc
+
+    gc.collect()
+    tracemalloc.start()
+    items = [build(fields) for fields in _news_fields(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    copy.deepcopy(items[:10000])
+    copy_ms = (time.perf_counter() - started) * 1000
+    return current, copy_ms
+
+
+def bench_memory(count):
+    from news_item import NewsItem
+
+    rows = []
+    results = {}
+    for label, build in (('dict', dict), ('NewsItem', lambda fields: NewsItem(**fields))):
+        size, copy_ms = _measure_items(build, count)
+        results[label] = size
+        rows.append([label, f"{size / 1024 / 1024:.1f}", f"{size / count:.0f}", f"{copy_ms:.1f}"])
+
+    print(f"Новостей: {count} (в памяти всё: строки полей, объекты, список)")
+    _print_table(['представление', 'МБ', 'байт на новость', 'deepcopy 10k мс'], rows)
+    saved = results['dict'] - results['NewsItem']
+    print(f"Экономия: {saved / 1024 / 1024:.1f} МБ на {count} новостей ({saved / results['dict']:.0%})")
+    return 0
+
+
+# ===== ВРЕМЯ ИМПОРТА =====
+
+# Эти модули не должны загружаться при импорте main.py - только при первом использовании
+LAZY_MODULES = ('selenium', 'feedparser', 'fake_useragent')
+
+
+def _importtime_once(module):
+    env = dict(os.environ, NEWS_REFRESH_ENABLED='0')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if not parts[0].strip().isdigit():
+            continue  # строка-заголовок
+        timings[parts[2].strip()] = int(parts[1])
+    return timings
+
+
+def bench_importtime(module, repeats, top, max_ms):
+    runs = [_importtime_once(module) for _ in range(repeats)]
+    total_ms = statistics.median(run.get(module, 0) for run in runs) / 1000
+    last = runs[-1]
+
+    print(f"import {module}: {total_ms:.1f} мс (медиана из {repeats})")
+    heaviest = sorted(last.items(), key=lambda item: item[1], reverse=True)[:top]
+    _print_table(['модуль', 'cumulative мс'], [[name, f"{us / 1000:.1f}"] for name, us in heaviest])
+
+    failed = False
+    eager = sorted(name for name in last if name.split('.')[0] in LAZY_MODULES)
+    if eager:
+        print(f"❌ Тяжёлые модули загружены при импорте: {', '.join(eager[:5])}")
+        failed = True
+    if max_ms and total_ms > max_ms:
+        print(f"❌ Импорт дольше порога {max_ms} мс")
+        failed = True
+    return 1 if failed else 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Бенчмарки парсеров новостей')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    selenium_cmd = commands.add_parser('selenium', help='профиль браузера full против scrape')
+    selenium_cmd.add_argument('urls', nargs='*', default=SELENIUM_URLS)
+    selenium_cmd.add_argument('--repeats', type=int, default=3)
+
+    importtime_cmd = commands.add_parser('importtime', help='время импорта по python -X importtime')
+    importtime_cmd.add_argument('--module', default='main')
+    importtime_cmd.add_argument('--repeats', type=int, default=5)
+    importtime_cmd.add_argument('--top', type=int, default=15)
+    importtime_cmd.add_argument('--max-ms', type=float, default=0,
+                                help='порог регрессии: ненулевой код выхода, если импорт дольше')
+
+    parse_cmd = commands.add_parser('parse', help='разбор страниц списков: BeautifulSoup против скомпилированных XPath')
+    parse_cmd.add_argument('--pages-dir', default=PAGES_DIR)
+    parse_cmd.add_argument('--repeats', type=int, default=5)
+    parse_cmd.add_argument('--download', action='store_true', help='сначала сохранить свежие страницы источников')
+
+    text_cmd = commands.add_parser('text', help='текст статей: prettify + повторный разбор против одного прохода')
+    text_cmd.add_argument('urls', nargs='*', help='сначала сохранить эти статьи')
+    text_cmd.add_argument('--articles-dir', default=ARTICLES_DIR)
+    text_cmd.add_argument('--repeats', type=int, default=5)
+
+    memory_cmd = commands.add_parser('memory', help='память на новости: словари против NewsItem')
+    memory_cmd.add_argument('--count', type=int, default=100000)
+
+    preview_cmd = commands.add_parser('preview', help='превью: прежний поиск оглавления против скомпилированного')
+    preview_cmd.add_argument('--articles-dir', default=ARTICLES_DIR, help='добавить тексты сохранённых статей')
+    preview_cmd.add_argument('--count', type=int, default=2000, help='сколько синтетических статей')
+    preview_cmd.add_argument('--repeats', type=int, default=5)
+    preview_cmd.add_argument('--length', type=int, default=300)
+
+    commands.add_parser('stem', help='стеммер поиска: падежные формы дают одну основу')
+
+    args = arg_parser.parse_args()
+    if args.command == 'selenium':
+        bench_selenium(args.urls, args.repeats)
+    elif args.command == 'importtime':
+        sys.exit(bench_importtime(args.module, args.repeats, args.top, args.max_ms))
+    elif args.command == 'parse':
+        sys.exit(bench_parse(args.pages_dir, args.repeats, args.download))
+    elif args.command == 'text':
+        sys.exit(bench_text(args.articles_dir, args.urls, args.repeats))
+    elif args.command == 'memory':
+        sys.exit(bench_memory(args.count))
+    elif args.command == 'preview':
+        sys.exit(bench_preview(args.articles_dir, args.count, args.repeats, args.length))
+    elif args.command == 'stem':
+        sys.exit(bench_stem())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+
+DEFAULT_MAX_DRIVERS = 2
+DEFAULT_MAX_PAGES_PER_DRIVER = 50
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """
+    Пул прогретых браузеров Selenium:
+    - одновременно работает не больше max_drivers браузеров;
+    - свободные браузеры не закрываются между категориями, а ждут следующей страницы;
+    - браузер пересоздаётся после max_pages_per_driver страниц или после ошибки.
+    Сам пул не зависит от selenium: драйверы создаёт переданная фабрика.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_drivers: int = DEFAULT_MAX_DRIVERS,
+                 max_pages_per_driver: int = DEFAULT_MAX_PAGES_PER_DRIVER):
+        self.factory = factory
+        self.max_drivers = max_drivers
+        self.max_pages_per_driver = max_pages_per_driver
+        self._slots = threading.BoundedSemaphore(max_drivers)
+        self._idle: List[_PooledDriver] = []
+        self._lock = threading.Lock()
+        self._counters = {'created': 0, 'recycled': 0, 'broken': 0, 'pages': 0}
+
+    def _checkout(self) -> _PooledDriver:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        pooled = _PooledDriver(self.factory())
+        with self._lock:
+            self._counters['created'] += 1
+        return pooled
+
+    def _quit(self, pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Ошибка закрытия браузера: {e}")
+
+    @contextmanager
+    def driver(self):
+        """Выдаёт браузер на одну страницу: `with pool.driver() as driver: ...`"""
+        self._slots.acquire()
+        pooled = None
+        healthy = True
+        try:
+            pooled = self._checkout()
+            yield pooled.driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if pooled is not None:
+                pooled.pages += 1
+                with self._lock:
+                    self._counters['pages'] += 1
+                    if not healthy:
+                        self._counters['broken'] += 1
+                    elif pooled.pages >= self.max_pages_per_driver:
+                        self._counters['recycled'] += 1
+
+                if healthy and pooled.pages < self.max_pages_per_driver:
+                    with self._lock:
+                        self._idle.append(pooled)
+                else:
+                    self._quit(pooled)
+            self._slots.release()
+
+    def warm_up(self, count: int = 1):
+        """Заранее запускает браузеры, чтобы первая страница не ждала старта Chrome"""
+        with self._lock:
+            count = min(count, self.max_drivers) - len(self._idle)
+        started = []
+        for _ in range(count):
+            self._slots.acquire()
+            try:
+                started.append(self._checkout())
+            finally:
+                self._slots.release()
+        with self._lock:
+            self._idle.extend(started)
+
+    def close(self):
+        """Закрывает все свободные браузеры"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._quit(pooled)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['idle'] = len(self._idle)
+        return stats
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Dict
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_BASE_COOLDOWN = 60
+DEFAULT_MAX_COOLDOWN = 3600
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для одного источника (или одного уровня каскада источника):
+    - closed: запросы идут, неудачи считаются;
+    - open: после failure_threshold неудач подряд источник пропускается на время cool-down;
+    - half_open: cool-down истёк, пропускаем одну пробную попытку.
+      Успех закрывает предохранитель, неудача открывает его снова с удвоенным cool-down.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 base_cooldown: float = DEFAULT_BASE_COOLDOWN,
+                 max_cooldown: float = DEFAULT_MAX_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = base_cooldown
+        self.open_until = 0.0
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Можно ли сейчас обращаться к источнику"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() < self.open_until:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_in_progress = False
+            # half_open: только одна пробная попытка одновременно
+            if self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.cooldown = self.base_cooldown
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.monotonic() + self.cooldown
+        self._trial_in_progress = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_in = max(0.0, self.open_until - time.monotonic()) if self.state == OPEN else 0.0
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'cooldown': self.cooldown,
+                'retry_in': round(retry_in, 1),
+            }
+
+
+class BreakerRegistry:
+    """Предохранители по ключам (URL источника, уровень каскада), создаются при первом обращении"""
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(**self.breaker_kwargs)
+                self._breakers[key] = breaker
+            return breaker
+
+    def snapshot(self, key) -> Dict:
+        with self._lock:
+            breaker = self._breakers.get(key)
+        return breaker.snapshot() if breaker else {'state': CLOSED, 'failures': 0}
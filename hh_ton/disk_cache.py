@@ -0,0 +1,174 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from url_canon import canonical_host
+
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Какие заголовки ответа нужны после восстановления из кэша
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class DiskResponseCache:
+    """
+    Кэш HTTP-ответов в SQLite: ключ - URL, тело сжато zlib.
+    - TTL задаётся по хостам (host_ttls), для остальных - default_ttl;
+    - суммарный размер ограничен max_bytes, лишнее вытесняется по LRU;
+    - offline=True отдаёт любые сохранённые ответы независимо от возраста и не ходит в сеть
+      (воспроизведение ранее записанных страниц).
+    Один файл можно использовать из нескольких процессов (gunicorn-воркеров).
+    """
+
+    def __init__(self, path: str, default_ttl: float = DEFAULT_TTL,
+                 host_ttls: Optional[Dict[str, float]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, offline: bool = False):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.host_ttls = host_ttls or {}
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                host TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return canonical_host(url)
+
+    def ttl_for(self, url: str) -> float:
+        return self.host_ttls.get(self._host(url), self.default_ttl)
+
+    def get(self, url: str, fresh_only: bool = True) -> Optional[requests.Response]:
+        """Ответ из кэша или None. fresh_only=False - отдать и устаревший"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, fetched_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+
+            status, headers, body, fetched_at = row
+            if fresh_only and not self.offline and time.time() - fetched_at > self.ttl_for(url):
+                self._counters['misses'] += 1
+                return None
+
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+            self._counters['hits'] += 1
+
+        return self._build_response(url, status, json.loads(headers), zlib.decompress(body))
+
+    def put(self, url: str, response: requests.Response):
+        """Сохраняет успешный ответ"""
+        if response.status_code != 200:
+            return
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = zlib.compress(response.content or b'', 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(url, host, status, headers, body, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, self._host(url), response.status_code, json.dumps(headers), body, len(body), now, now)
+            )
+            self._conn.commit()
+            self._counters['stores'] += 1
+            self._evict()
+
+    def touch(self, url: str):
+        """Сервер подтвердил (304), что сохранённая версия актуальна - продлеваем TTL"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?', (now, now, url)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Освобождаем с запасом, чтобы не вытеснять на каждой записи
+        target = self.max_bytes * 0.9
+        victims = []
+        for url, size in self._conn.execute('SELECT url, size FROM responses ORDER BY accessed_at'):
+            if total <= target:
+                break
+            victims.append((url,))
+            total -= size
+        self._conn.executemany('DELETE FROM responses WHERE url = ?', victims)
+        self._conn.commit()
+        self._counters['evictions'] += len(victims)
+
+    @staticmethod
+    def _build_response(url: str, status: int, headers: Dict[str, str], body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        # Тело уже в памяти: iter_content() для stream-запросов отдаёт его кусками
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def not_modified(url: str, cached: requests.Response) -> requests.Response:
+        """Синтетический 304 для условного запроса, совпавшего с сохранённым ответом"""
+        response = requests.Response()
+        response.status_code = 304
+        response.reason = 'Not Modified'
+        response.url = url
+        response.headers = CaseInsensitiveDict(
+            {name: cached.headers[name] for name in ('ETag', 'Last-Modified') if name in cached.headers}
+        )
+        response._content = b''
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def matches_validators(request_headers: Dict[str, str], cached: requests.Response) -> bool:
+        if not request_headers:
+            return False
+        etag = cached.headers.get('ETag')
+        last_modified = cached.headers.get('Last-Modified')
+        return bool(
+            (etag and request_headers.get('If-None-Match') == etag)
+            or (last_modified and request_headers.get('If-Modified-Since') == last_modified)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        stats.update({'entries': entries, 'bytes': size})
+        return stats
@@ -0,0 +1,163 @@
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+
+from lxml import etree
+
+
+# Сколько записей ленты нужно по умолчанию и сколько секунд даём на чтение целиком
+DEFAULT_ENTRY_LIMIT = 20
+DEFAULT_DEADLINE = 20
+CHUNK_SIZE = 16 * 1024
+
+MEDIA_NAMESPACES = ('http://search.yahoo.com/mrss/', 'http://search.yahoo.com/mrss')
+
+
+class FeedEntry(dict):
+    """
+    Запись ленты с доступом к полям как к атрибутам - как у feedparser:
+    entry.title, entry.link, hasattr(entry, 'description') и т.д.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class FeedResult:
+    def __init__(self, entries: List[FeedEntry], complete: bool, bytes_read: int):
+        self.entries = entries
+        # complete=False - чтение остановлено досрочно (набрали limit записей или вышел срок)
+        self.complete = complete
+        self.bytes_read = bytes_read
+
+
+def _localname(element) -> str:
+    return etree.QName(element).localname if isinstance(element.tag, str) else ''
+
+
+def _text(element) -> str:
+    return ''.join(element.itertext()).strip()
+
+
+def _struct_time(value: str):
+    """RFC 822 (RSS) или ISO 8601 (Atom) -> time.struct_time в UTC, как published_parsed у feedparser"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.utctimetuple()
+
+
+def _entry_from_element(item) -> FeedEntry:
+    """<item> (RSS) или <entry> (Atom) -> FeedEntry с полями, которые читает парсер"""
+    entry = FeedEntry()
+    links = []
+
+    for child in item:
+        name = _localname(child)
+        namespace = etree.QName(child).namespace if isinstance(child.tag, str) else None
+
+        if namespace in MEDIA_NAMESPACES:
+            if name == 'thumbnail' and child.get('url'):
+                entry.setdefault('media_thumbnail', []).append({'url': child.get('url')})
+            continue
+
+        if name == 'title':
+            entry['title'] = _text(child)
+        elif name == 'link':
+            href = child.get('href')
+            if href:
+                # Atom: <link rel="alternate" href="..."/>
+                rel = child.get('rel', 'alternate')
+                links.append(FeedEntry(rel=rel, type=child.get('type', ''), href=href))
+                if rel == 'alternate' and 'link' not in entry:
+                    entry['link'] = href
+            elif 'link' not in entry:
+                entry['link'] = _text(child)
+        elif name == 'enclosure' and child.get('url'):
+            links.append(FeedEntry(rel='enclosure', type=child.get('type', ''), href=child.get('url')))
+        elif name in ('description', 'summary') and 'description' not in entry:
+            entry['description'] = _text(child)
+        elif name in ('pubDate', 'published', 'issued'):
+            entry['published_parsed'] = _struct_time(_text(child))
+        elif name == 'updated':
+            entry['updated_parsed'] = _struct_time(_text(child))
+
+    if links:
+        entry['links'] = links
+    return entry
+
+
+def parse_feed_stream(chunks, limit: int = DEFAULT_ENTRY_LIMIT,
+                      deadline: Optional[float] = None) -> FeedResult:
+    """
+    Инкрементальный разбор RSS/Atom: куски байтов подаются в XMLPullParser,
+    разбор останавливается, как только собрано limit записей.
+    deadline - момент time.monotonic(), после которого чтение прекращается.
+    Разобранные элементы сразу очищаются, поэтому большая лента не держится в памяти целиком.
+    """
+    parser = etree.XMLPullParser(events=('end',), recover=True, resolve_entities=False, no_network=True)
+    entries = []
+    bytes_read = 0
+    complete = True
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        bytes_read += len(chunk)
+        parser.feed(chunk)
+
+        for _, element in parser.read_events():
+            if _localname(element) in ('item', 'entry'):
+                entries.append(_entry_from_element(element))
+                element.clear()
+                if len(entries) >= limit:
+                    return FeedResult(entries, False, bytes_read)
+
+        if deadline is not None and time.monotonic() > deadline:
+            print(f"⏱️ Срок чтения ленты истёк, разобрано записей: {len(entries)}")
+            complete = False
+            break
+
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass
+    return FeedResult(entries, complete, bytes_read)
+
+
+def read_feed(response, limit: int = DEFAULT_ENTRY_LIMIT, deadline_seconds: float = DEFAULT_DEADLINE):
+    """
+    Читает ленту из requests-ответа (желательно stream=True) и перестаёт читать сокет
+    после limit записей или по истечении deadline_seconds.
+    Если потоковый разбор ничего не нашёл, а лента прочитана полностью - отдаём её feedparser.
+    """
+    deadline = time.monotonic() + deadline_seconds
+    body = []
+
+    def chunks():
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body.append(chunk)
+            yield chunk
+
+    try:
+        result = parse_feed_stream(chunks(), limit, deadline)
+    finally:
+        response.close()
+
+    if not result.entries and result.complete and body:
+        import feedparser
+        return feedparser.parse(b''.join(body))
+    return result
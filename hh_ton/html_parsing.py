@@ -0,0 +1,74 @@
+from typing import Optional
+
+import lxml.html
+from bs4 import BeautifulSoup, CData, NavigableString
+
+
+# Основной HTML-бэкенд: lxml на C в разы быстрее чистого Python 'html.parser'
+HTML_BACKEND = 'lxml'
+XML_BACKEND = 'lxml-xml'
+
+# Строки, которые видит get_text(): без комментариев, скриптов, <template>, <rt>/<rp>
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+XML_CONTENT_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/xml', 'text/xml')
+URL_XML_INDICATORS = ('rss', 'xml', 'feed', 'export')
+
+
+def is_xml_response(response, url: str = '') -> bool:
+    """
+    XML или HTML - решаем по Content-Type ответа.
+    Если заголовка нет, смотрим на начало тела и только в крайнем случае на URL
+    """
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type:
+        if 'html' in content_type:
+            return False
+        if content_type in XML_CONTENT_TYPES or content_type.endswith('+xml'):
+            return True
+
+    head = (response.content or b'')[:512].lstrip().lower()
+    if head.startswith(b'<?xml') or head.startswith(b'<rss') or head.startswith(b'<feed'):
+        return b'<html' not in head
+    if head.startswith(b'<!doctype html') or head.startswith(b'<html'):
+        return False
+
+    return not content_type and any(indicator in url.lower() for indicator in URL_XML_INDICATORS)
+
+
+def make_soup(response, url: str = '', encoding: Optional[str] = 'utf-8') -> BeautifulSoup:
+    """BeautifulSoup из requests-ответа: lxml для HTML, lxml-xml для лент"""
+    if is_xml_response(response, url):
+        return BeautifulSoup(response.content, XML_BACKEND)
+    if encoding:
+        response.encoding = encoding
+    return BeautifulSoup(response.text, HTML_BACKEND)
+
+
+def make_tree(response, encoding: Optional[str] = 'utf-8'):
+    """
+    Дерево lxml.html без BeautifulSoup - для страниц-списков, которые разбираются
+    скомпилированными описаниями источников (site_specs)
+    """
+    parser = lxml.html.HTMLParser(encoding=encoding or response.encoding)
+    return lxml.html.document_fromstring(response.content, parser=parser)
+
+
+def tree_from_html(html: str):
+    """Дерево lxml.html из уже декодированной строки (page_source браузера)"""
+    return lxml.html.document_fromstring(html)
+
+
+def text_lines(element) -> str:
+    """
+    Текст элемента построчно за один обход: каждая строка каждого текстового узла
+    обрезается, пустые отбрасываются, непустые соединяются переводом строки
+    """
+    lines = []
+    for node in element.descendants:
+        if type(node) in TEXT_STRING_TYPES:
+            for line in node.splitlines():
+                line = line.strip()
+                if line:
+                    lines.append(line)
+    return '\n'.join(lines)
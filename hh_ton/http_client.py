@@ -0,0 +1,148 @@
+import os
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from disk_cache import DiskResponseCache, DEFAULT_MAX_BYTES, DEFAULT_TTL
+
+
+def _env_number(name: str, default, cast=float):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Настройки пула соединений (переопределяются переменными окружения)
+DEFAULT_POOL_SIZE = _env_number('HTTP_POOL_SIZE', 20, int)
+DEFAULT_CONNECT_TIMEOUT = _env_number('HTTP_CONNECT_TIMEOUT', 5)
+DEFAULT_READ_TIMEOUT = _env_number('HTTP_READ_TIMEOUT', 15)
+DEFAULT_MAX_RETRIES = _env_number('HTTP_MAX_RETRIES', 2, int)
+
+# Дисковый кэш ответов включается переменной HTTP_CACHE_PATH (путь к файлу SQLite)
+HTTP_CACHE_PATH = os.environ.get('HTTP_CACHE_PATH', '')
+HTTP_CACHE_TTL = _env_number('HTTP_CACHE_TTL', DEFAULT_TTL)
+HTTP_CACHE_MAX_BYTES = _env_number('HTTP_CACHE_MAX_MB', DEFAULT_MAX_BYTES // (1024 * 1024), int) * 1024 * 1024
+HTTP_CACHE_OFFLINE = os.environ.get('HTTP_CACHE_OFFLINE', '0') == '1'
+
+# TTL дискового кэша по хостам: ленты обновляются чаще, чем разделы сайтов
+HTTP_CACHE_HOST_TTLS = {
+    'tass.ru': 180,
+    'interfax.ru': 180,
+    'ria.ru': 180,
+    'k-obr.spb.ru': 1800,
+    'doctorpiter.ru': 900,
+}
+
+
+def accept_encoding() -> str:
+    """Заявляем br только если установлен brotli - иначе urllib3 не сможет распаковать ответ"""
+    try:
+        import brotli  # noqa: F401
+        return 'gzip, deflate, br'
+    except ImportError:
+        return 'gzip, deflate'
+
+
+class PooledSession(requests.Session):
+    """
+    Сессия с keep-alive пулом соединений, таймаутами по умолчанию и сжатием.
+    Одна на все парсеры, чтобы соединения к одним и тем же хостам переиспользовались.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 cache: Optional[DiskResponseCache] = None):
+        super().__init__()
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.cache = cache
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+        self.headers.update({
+            'Accept-Encoding': accept_encoding(),
+            'Connection': 'keep-alive',
+        })
+
+    def request(self, method, url, **kwargs):
+        # Без таймаута один зависший сайт навсегда занимает воркер Flask
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        if self.cache is None or method.upper() != 'GET' or kwargs.get('params'):
+            return super().request(method, url, **kwargs)
+        return self._cached_get(url, **kwargs)
+
+    def _cached_get(self, url, **kwargs):
+        """GET через дисковый кэш: свежий ответ отдаём без сети, условный запрос - синтетическим 304"""
+        cached = self.cache.get(url)
+        if cached is not None:
+            if self.cache.matches_validators(kwargs.get('headers'), cached):
+                return self.cache.not_modified(url, cached)
+            return cached
+
+        if self.cache.offline:
+            raise requests.ConnectionError(f'Нет сохранённого ответа для {url} (офлайн-режим)')
+
+        response = super().request('GET', url, **kwargs)
+        # Потоковый ответ могут не дочитать до конца - такой не сохраняем
+        if response.status_code == 200 and not kwargs.get('stream'):
+            self.cache.put(url, response)
+        elif response.status_code == 304:
+            self.cache.touch(url)
+        return response
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Общая сессия всех парсеров (создаётся при первом обращении)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession(cache=default_disk_cache())
+    return _session
+
+
+def default_disk_cache() -> Optional[DiskResponseCache]:
+    """Дисковый кэш из переменных окружения или None, если он не включён"""
+    if not HTTP_CACHE_PATH:
+        return None
+    return DiskResponseCache(
+        HTTP_CACHE_PATH,
+        default_ttl=HTTP_CACHE_TTL,
+        host_ttls=HTTP_CACHE_HOST_TTLS,
+        max_bytes=HTTP_CACHE_MAX_BYTES,
+        offline=HTTP_CACHE_OFFLINE,
+    )
+
+
+def configure_session(**kwargs) -> PooledSession:
+    """
+    Пересоздаёт общую сессию с новыми параметрами
+    (pool_size, connect_timeout, read_timeout, max_retries, cache).
+    Парсеры, уже получившие старую сессию, продолжат работать с ней.
+    """
+    global _session
+    with _session_lock:
+        _session = PooledSession(**kwargs)
+    return _session
@@ -1,7 +1,13 @@
+import os
+
 from flask import Flask, request, render_template
 
 import Parsing_politics_science_health as PSH
 import Parsing_sport_IT_education as SIE
+from news_cache import NewsCache, NewsRefresher, DEFAULT_REFRESH_INTERVAL, DEFAULT_TTL_FACTOR
+from news_store import DEFAULT_PAGE_SIZE, default_news_store
+from news_search import default_search_index
+from article_cache import default_article_cache
 
 
 
@@ -9,12 +15,93 @@ app = Flask(__name__)
 
 cnt = list(range(1))
 
+# Интервалы фонового обновления категорий (секунды).
+# Переопределяются переменными окружения NEWS_REFRESH_<КАТЕГОРИЯ>, например NEWS_REFRESH_IT=120
+REFRESH_INTERVALS = {
+    'it': 300,
+    'sport': 300,
+    'education': 900,
+    'politics': 600,
+    'science': 900,
+    'health': 900,
+}
+
+CATEGORY_LOADERS = {
+    'it': lambda: SIE.parse_latest_news_it(SIE.URL_IT),
+    'sport': lambda: SIE.parse_latest_news_sport(SIE.URL_SPORT),
+    'education': lambda: SIE.parse_latest_news_education(SIE.URL_EDUCATION),
+    'politics': lambda: PSH.parse_latest_news_politics(parallel=True),
+    'science': lambda: PSH.parse_latest_news_science(parallel=True),
+    'health': lambda: PSH.parse_latest_news_health(parallel=True),
+}
+
+news_cache = NewsCache()
+# История новостей в SQLite (включается NEWS_DB_PATH); без неё страницы читают кэш в памяти
+news_store = default_news_store()
+news_refresher = NewsRefresher(news_cache, news_store, default_search_index)
+# Ленты, общие для политики, науки и здоровья, качаются один раз за проход обновления
+news_refresher.on_cycle(lambda: PSH.get_advanced_parser().shared_feeds.start_cycle())
+# Тексты статей, скачанные парсерами, тоже попадают в поиск
+default_article_cache.subscribe(default_search_index.on_article)
+
+# Разделы сайта для фильтра поиска
+SEARCH_CATEGORIES = {
+    'politics': 'Политика',
+    'science': 'Наука',
+    'health': 'Здоровье',
+    'it': 'IT',
+    'sport': 'Спорт',
+    'education': 'Образование',
+}
+
+
+def _env_seconds(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def start_background_refresh():
+    """Регистрирует категории и запускает фоновое обновление кэша"""
+    default_interval = _env_seconds('NEWS_REFRESH_INTERVAL', DEFAULT_REFRESH_INTERVAL)
+    for category, loader in CATEGORY_LOADERS.items():
+        interval = _env_seconds(f'NEWS_REFRESH_{category.upper()}',
+                                REFRESH_INTERVALS.get(category, default_interval))
+        ttl = _env_seconds(f'NEWS_TTL_{category.upper()}', interval * DEFAULT_TTL_FACTOR)
+        news_refresher.register(category, loader, interval=interval, ttl=ttl)
+    news_refresher.start()
+
+
+def category_news(category):
+    """
+    Новости категории для страницы.
+    С хранилищем - последние записи из SQLite (?page=2 - следующая страница истории),
+    пока хранилище пустое или не включено - последний результат парсинга из кэша
+    """
+    if news_store is not None:
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+        except ValueError:
+            page = 1
+        news = news_store.latest(category, DEFAULT_PAGE_SIZE, (page - 1) * DEFAULT_PAGE_SIZE)
+        if news or page > 1:
+            return news
+    return news_cache.get(category)['news']
+
+
+# При запуске через `python main.py` с debug=True модуль исполняется дважды:
+# в процессе-наблюдателе reloader'а обновление не нужно
+_is_reloader_parent = __name__ == '__main__' and not os.environ.get('WERKZEUG_RUN_MAIN')
+
+if os.environ.get('NEWS_REFRESH_ENABLED', '1') != '0' and not _is_reloader_parent:
+    start_background_refresh()
+
 
 @app.route('/')
 def base():
-    arr = SIE.parse_latest_news_it(SIE.URL_IT)
     return render_template('base.html', 
-                            news=arr["news"],
+                            news=category_news('it'),
                             countF=cnt)
 
 
@@ -25,53 +112,61 @@ def pronget():
 
 @app.route('/pol')
 def pol():
-    arr = PSH.parse_latest_news_politics(PSH.URL_POLITICS)
     return render_template('pol.html',
-                           news=arr["news"]
+                           news=category_news('politics')
                            )
 
 
 @app.route('/it')
 def it():
-    arr = SIE.parse_latest_news_it(SIE.URL_IT)
     return render_template('it.html',
-                           news=arr["news"]
+                           news=category_news('it')
                            )
 
 
 @app.route('/sp')
 def sp():
-    arr = SIE.parse_latest_news_sport(SIE.URL_SPORT)
     return render_template('sport.html',
-                           news=arr["news"]
+                           news=category_news('sport')
                            )
 
 
 @app.route('/educ')
 def educ():
-    arr = SIE.parse_latest_news_education(SIE.URL_EDUCATION)
     return render_template('educ.html',
-                           news=arr["news"]
+                           news=category_news('education')
                            )
 
 
 @app.route('/healph')
 def heal():
-    arr = PSH.parse_latest_news_health(PSH.URL_HEALTH)
     return render_template('heal.html',
-                           news=arr["news"]
+                           news=category_news('health')
                            )
 
 
 @app.route('/science')
 def scin():
-    arr = PSH.parse_latest_news_science(PSH.URL_SCIENCE)
     return render_template('scin.html',
-                           news=arr["news"]
+                           news=category_news('science')
                            )
 
 
 
+@app.route('/search')
+def search():
+    query = request.args.get('q', '').strip()
+    category = request.args.get('category', '')
+    if category not in SEARCH_CATEGORIES:
+        category = ''
+    return render_template('search.html',
+                           query=query,
+                           category=category,
+                           categories=SEARCH_CATEGORIES,
+                           news=default_search_index.search(query, category or None)
+                           )
+
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
@@ -0,0 +1,207 @@
+"""
+Поиск почти одинаковых новостей: одна и та же новость РИА, ТАСС и Интерфакса
+с немного разными заголовками должна занимать в ленте одно место.
+
+Заголовок (и лид, если он есть) превращается в множество грубых основ слов
+(первые STEM_LENGTH букв), по нему считается MinHash-подпись. Подпись режется на полосы (LSH):
+новости, совпавшие хотя бы в одной полосе, - кандидаты, и только для них считается
+точный коэффициент Жаккара. Проверка новой новости - O(числа полос), без попарного сравнения.
+
+Похожие новости собираются в кластеры; в ленте остаётся один представитель кластера
+(по умолчанию - с картинкой и описанием), а в поле 'duplicates' - сколько ещё источников её дали.
+"""
+import hashlib
+import re
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+# Основа слова - первые 5 букв: 'переговоры' и 'переговорах' совпадают
+STEM_LENGTH = 5
+# Короткие слова отбрасываются, числа - нет: 'матч 1' и 'матч 2' - разные новости
+MIN_TOKEN_LENGTH = 3
+# Заголовки из меньшего числа слов не сравниваются (точные дубликаты отсекаются раньше)
+MIN_TOKENS = 3
+
+# 32 хэш-функции, 16 полос по 2 строки: пары с Жаккаром от 0.5 становятся кандидатами с вероятностью от 99%
+NUM_PERM = 32
+BANDS = 16
+TITLE_THRESHOLD = 0.6
+LEAD_THRESHOLD = 0.5
+LEAD_TOKENS = 40
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+STOP_WORDS = frozenset((
+    'для', 'что', 'как', 'это', 'его', 'она', 'они', 'при', 'под', 'над', 'без', 'или',
+    'так', 'уже', 'еще', 'ещё', 'там', 'тут', 'все', 'всё', 'был', 'была', 'были', 'будет',
+    'the', 'and', 'for',
+))
+
+
+def _token_hash(token: str) -> int:
+    """Стабильный между процессами хэш (встроенный hash() строк рандомизирован)"""
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _permutations(count: int) -> List[Tuple[int, int]]:
+    return [
+        (_token_hash(f'a{i}') % (_MERSENNE_PRIME - 1) + 1, _token_hash(f'b{i}') % _MERSENNE_PRIME)
+        for i in range(count)
+    ]
+
+
+PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def fingerprint(text: str, limit: Optional[int] = None) -> FrozenSet[str]:
+    """Множество основ значимых слов текста"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if (len(token) < MIN_TOKEN_LENGTH and not token.isdigit()) or token in STOP_WORDS:
+            continue
+        tokens.append(token[:STEM_LENGTH])
+        if limit and len(tokens) >= limit:
+            break
+    return frozenset(tokens)
+
+
+def minhash(tokens: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [_token_hash(token) for token in tokens]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in PERMUTATIONS
+    )
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class LSHIndex:
+    """Полосы MinHash-подписей -> множества id; кандидаты проверяются точным Жаккаром"""
+
+    def __init__(self, threshold: float, bands: int = BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._buckets = {}
+        self._tokens = {}
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def query(self, tokens: FrozenSet[str], signature: Tuple[int, ...]) -> Optional[int]:
+        """id самого похожего из уже добавленных (не ниже порога) или None"""
+        best_id, best_score = None, self.threshold
+        checked = set()
+        for key in self._band_keys(signature):
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                score = jaccard(tokens, self._tokens[candidate])
+                if score >= best_score:
+                    best_id, best_score = candidate, score
+        return best_id
+
+    def add(self, item_id: int, tokens: FrozenSet[str], signature: Tuple[int, ...]):
+        self._tokens[item_id] = tokens
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(item_id)
+
+
+def default_preference(item: Dict) -> Tuple:
+    """Чем больше, тем лучше представитель кластера: с картинкой, с описанием, с длинным заголовком"""
+    return bool(item.get('image')), bool(item.get('description')), len(item.get('title', ''))
+
+
+class NearDuplicateClusters:
+    """
+    Кластеры почти одинаковых новостей, добавляемых по одной.
+    add(item) возвращает (номер кластера, новый ли кластер)
+    """
+
+    def __init__(self, title_threshold: float = TITLE_THRESHOLD, lead_threshold: float = LEAD_THRESHOLD,
+                 preference: Callable[[Dict], Tuple] = default_preference,
+                 lead: Callable[[Dict], str] = lambda item: item.get('description', '')):
+        self.titles = LSHIndex(title_threshold)
+        self.leads = LSHIndex(lead_threshold)
+        self.preference = preference
+        self.lead = lead
+        self.representatives = []
+        self.sizes = []
+        # Номер кластера каждой добавленной новости (индексы хранят номера новостей)
+        self._cluster_of = []
+
+    def _find(self, item: Dict):
+        title = item.get('title', '')
+        title_tokens = fingerprint(title)
+        lead_tokens = fingerprint(self.lead(item) or '', LEAD_TOKENS)
+
+        signatures = {}
+        cluster = None
+        if len(title_tokens) >= MIN_TOKENS:
+            signatures['title'] = minhash(title_tokens)
+            member = self.titles.query(title_tokens, signatures['title'])
+            cluster = None if member is None else self._cluster_of[member]
+        if cluster is None and len(lead_tokens) >= MIN_TOKENS:
+            signatures['lead'] = minhash(lead_tokens)
+            member = self.leads.query(lead_tokens, signatures['lead'])
+            cluster = None if member is None else self._cluster_of[member]
+        return cluster, title_tokens, lead_tokens, signatures
+
+    def add(self, item: Dict) -> Tuple[int, bool]:
+        cluster, title_tokens, lead_tokens, signatures = self._find(item)
+        is_new = cluster is None
+        if is_new:
+            cluster = len(self.representatives)
+            self.representatives.append(item)
+            self.sizes.append(0)
+        elif self.preference(item) > self.preference(self.representatives[cluster]):
+            self.representatives[cluster] = item
+        self.sizes[cluster] += 1
+
+        # Каждый участник пополняет индексы: кластер находится по любой из формулировок
+        member = len(self._cluster_of)
+        if len(title_tokens) >= MIN_TOKENS:
+            self.titles.add(member, title_tokens, signatures.get('title') or minhash(title_tokens))
+        if len(lead_tokens) >= MIN_TOKENS:
+            self.leads.add(member, lead_tokens, signatures.get('lead') or minhash(lead_tokens))
+        self._cluster_of.append(cluster)
+        return cluster, is_new
+
+
+def collapse_near_duplicates(items: Iterable[Dict], limit: Optional[int] = None,
+                             clusters: Optional[NearDuplicateClusters] = None,
+                             stop_at_limit: bool = False) -> Tuple[List[Dict], int]:
+    """
+    Лента без почти одинаковых новостей: кластер стоит на месте своей первой новости,
+    представлен лучшей по preference, в 'duplicates' - сколько новостей в него слито.
+    Возвращает (первые limit кластеров, всего кластеров). По умолчанию items читаются до конца,
+    чтобы представитель выбирался среди всех участников; stop_at_limit=True прекращает чтение,
+    как только набрано limit кластеров (для ленивых источников вроде merge_timeline) -
+    тогда представитель и duplicates учитывают только прочитанное, а кластеров всего - прочитанные
+    """
+    clusters = clusters or NearDuplicateClusters()
+    positions = []
+    for item in items:
+        cluster, is_new = clusters.add(item)
+        if is_new and (limit is None or len(positions) < limit):
+            positions.append(cluster)
+            if stop_at_limit and len(positions) == limit:
+                break
+
+    result = []
+    for cluster in positions:
+        representative = clusters.representatives[cluster]
+        if clusters.sizes[cluster] > 1:
+            representative['duplicates'] = clusters.sizes[cluster] - 1
+        result.append(representative)
+    return result, len(clusters.representatives)
@@ -0,0 +1,200 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+# Интервал обновления категории по умолчанию (секунды)
+DEFAULT_REFRESH_INTERVAL = 300
+# Сколько живут данные категории в кэше, если TTL не задан явно
+DEFAULT_TTL_FACTOR = 3
+# После TTL данные ещё отдаются (с предупреждением в логе), но не дольше STALE_LIMIT_FACTOR * TTL
+STALE_LIMIT_FACTOR = 4
+
+
+class NewsCache:
+    """
+    Потокобезопасный кэш новостей в памяти с TTL для каждой категории.
+    Просроченные данные (обновление не удаётся) ещё отдаются, пока не пройдёт
+    stale_limit_factor * TTL, - дальше категория считается пустой
+    """
+
+    def __init__(self, stale_limit_factor: float = STALE_LIMIT_FACTOR):
+        self.stale_limit_factor = stale_limit_factor
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def set(self, category: str, data: Dict, ttl: float):
+        """Сохраняет результат парсинга категории"""
+        now = time.time()
+        with self._lock:
+            self._entries[category] = {
+                'data': data,
+                'updated_at': now,
+                'expires_at': now + ttl,
+                'discard_at': now + ttl * self.stale_limit_factor,
+                'warned': False,
+            }
+
+    def get(self, category: str) -> Dict:
+        """
+        Возвращает последние данные категории.
+        Просроченные данные всё равно отдаются - лучше старые новости, чем пустая страница,
+        но после жёсткого предела (discard_at) запись удаляется и категория пуста.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(category)
+            if not entry:
+                return {'news': []}
+            if entry['discard_at'] <= now:
+                del self._entries[category]
+                print(f"🗑️ Данные категории {category} устарели на {now - entry['expires_at']:.0f} с и больше не отдаются")
+                return {'news': []}
+            if entry['expires_at'] <= now and not entry['warned']:
+                entry['warned'] = True
+                print(f"⚠️ Отдаём просроченные данные категории {category}: "
+                      f"обновлены {now - entry['updated_at']:.0f} с назад")
+        return entry['data']
+
+    def is_expired(self, category: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(category)
+        return not entry or entry['expires_at'] <= time.time()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Состояние кэша по категориям"""
+        now = time.time()
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            category: {
+                'news': len(entry['data'].get('news', [])),
+                'age': round(now - entry['updated_at'], 1),
+                'expired': entry['expires_at'] <= now,
+            }
+            for category, entry in entries.items()
+        }
+
+
+class NewsRefresher:
+    """
+    Фоновый планировщик: периодически парсит каждую категорию и кладёт результат в NewsCache.
+    Если заданы хранилище (news_store.NewsStore) и поисковый индекс (news_search.NewsSearchIndex),
+    новые новости каждого обновления дописываются и в них.
+    Проход - все категории, подошедшие к обновлению одновременно; перед каждым проходом
+    вызываются подписчики on_cycle (например, сброс общих лент SingleFlightCache.start_cycle)
+    """
+
+    def __init__(self, cache: NewsCache, store=None, search=None):
+        self.cache = cache
+        self.store = store
+        self.search = search
+        self._jobs = {}
+        self._cycle_listeners = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def register(self, category: str, loader: Callable[[], Dict],
+                 interval: float = DEFAULT_REFRESH_INTERVAL, ttl: Optional[float] = None):
+        """Регистрирует категорию: loader вызывается раз в interval секунд"""
+        with self._lock:
+            self._jobs[category] = {
+                'loader': loader,
+                'interval': interval,
+                'ttl': ttl if ttl is not None else interval * DEFAULT_TTL_FACTOR,
+                'next_run': 0.0,
+                'last_error': None,
+            }
+        self._wakeup.set()
+
+    def on_cycle(self, listener: Callable[[], None]):
+        """listener() вызывается в начале каждого прохода обновления"""
+        self._cycle_listeners.append(listener)
+
+    def _start_cycle(self):
+        for listener in self._cycle_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"💥 Ошибка подписчика начала цикла обновления: {e}")
+
+    def categories(self) -> List[str]:
+        with self._lock:
+            return list(self._jobs)
+
+    def refresh(self, category: str) -> bool:
+        """Синхронно обновляет одну категорию. При ошибке в кэше остаются прежние данные"""
+        with self._lock:
+            job = self._jobs.get(category)
+        if not job:
+            return False
+
+        started = time.time()
+        try:
+            data = job['loader']()
+        except Exception as e:
+            print(f"💥 Ошибка обновления категории {category}: {e}")
+            job['last_error'] = str(e)
+            return False
+        finally:
+            job['next_run'] = time.time() + job['interval']
+
+        job['last_error'] = None
+        self.cache.set(category, data, job['ttl'])
+        added = ''
+        for place, sink in (('хранилище', self.store), ('поиске', self.search)):
+            if sink is None:
+                continue
+            try:
+                added += f", новых в {place}: {sink.ingest(category, data.get('news', []))}"
+            except Exception as e:
+                print(f"💥 Ошибка записи категории {category} ({place}): {e}")
+        print(f"♻️ Категория {category} обновлена за {time.time() - started:.1f} с: "
+              f"{len(data.get('news', []))} новостей{added}")
+        return True
+
+    def refresh_all(self):
+        self._start_cycle()
+        for category in self.categories():
+            self.refresh(category)
+
+    def start(self):
+        """Запускает фоновый поток обновления (повторный вызов ничего не делает)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='news-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _due_categories(self) -> List[str]:
+        now = time.time()
+        with self._lock:
+            return [category for category, job in self._jobs.items() if job['next_run'] <= now]
+
+    def _seconds_until_next_run(self) -> float:
+        with self._lock:
+            if not self._jobs:
+                return DEFAULT_REFRESH_INTERVAL
+            next_run = min(job['next_run'] for job in self._jobs.values())
+        return max(0.0, next_run - time.time())
+
+    def _run(self):
+        while not self._stopped.is_set():
+            due = self._due_categories()
+            if due:
+                self._start_cycle()
+            for category in due:
+                if self._stopped.is_set():
+                    return
+                self.refresh(category)
+
+            self._wakeup.clear()
+            self._wakeup.wait(self._seconds_until_next_run())
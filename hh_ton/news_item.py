@@ -0,0 +1,120 @@
+"""
+Компактная новость: объект со __slots__ вместо словаря.
+
+У словаря на каждую новость своя хэш-таблица ключей; у NewsItem - только массив ссылок на значения.
+Имена источника и категории интернируются: тысячи новостей ссылаются на одну строку.
+Для совместимости NewsItem ведёт себя как словарь: item['title'], item.get('image', ''),
+'description' in item, dict(item), сравнение со словарём - шаблоны и старый код работают как прежде.
+Незаданное поле считается отсутствующим ключом, как в словаре.
+"""
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+
+class NewsItem:
+    __slots__ = (
+        'title', 'date', 'time', 'image', 'link', 'source', 'description',
+        'category', 'published_at', 'duplicates',
+    )
+
+    FIELDS = frozenset(__slots__)
+    INTERNED = ('source', 'category')
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            self[name] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NewsItem':
+        return data if isinstance(data, cls) else cls(**data)
+
+    # ----- Доступ как к словарю -----
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name: str, value: Any):
+        if name not in self.FIELDS:
+            raise KeyError(f"NewsItem не поддерживает поле {name!r}")
+        if name in self.INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+
+    def __delitem__(self, name: str):
+        try:
+            delattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.FIELDS and hasattr(self, name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self.__slots__ if hasattr(self, name))
+
+    def values(self) -> Iterator[Any]:
+        return (getattr(self, name) for name in self.keys())
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name)) for name in self.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def update(self, other=(), **fields):
+        pairs = other.items() if hasattr(other, 'items') else other
+        for name, value in pairs:
+            self[name] = value
+        for name, value in fields.items():
+            self[name] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    # ----- Копирование и сравнение -----
+
+    def copy(self) -> 'NewsItem':
+        item = NewsItem.__new__(NewsItem)
+        for name, value in self.items():
+            object.__setattr__(item, name, value)
+        return item
+
+    def __copy__(self) -> 'NewsItem':
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> 'NewsItem':
+        # Значения - строки и числа, копировать их незачем
+        return self.copy()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            self[name] = value
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, NewsItem):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'NewsItem({self.to_dict()!r})'
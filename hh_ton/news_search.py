@@ -0,0 +1,285 @@
+"""
+Полнотекстовый поиск по новостям: SQLite FTS5 с ранжированием BM25.
+
+Индексируются заголовок, описание из RSS и текст статьи (get_full_article_text*).
+В FTS5 нет русской морфологии, поэтому текст заранее приводится к основам (normalize)
+русским стеммером Snowball (пакет snowballstemmer): 'президента', 'президенту' -> 'президент', 'ё' -> 'е'.
+Без пакета работает лёгкий запасной стеммер, отсекающий только окончания существительных и прилагательных.
+Запрос нормализуется так же, и слова ищутся по точному совпадению основ - это обычный
+поиск по инвертированному индексу FTS5, без перебора документов.
+
+Индекс пополняется по мере поступления: NewsRefresher передаёт новости каждого обновления,
+ArticleCache - каждый новый или изменившийся текст статьи. Уже проиндексированное не трогается.
+"""
+import functools
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from news_item import NewsItem
+from news_store import item_key
+from timeline import parse_timestamp
+
+
+# Сохранение индекса между перезапусками включается переменной SEARCH_DB_PATH (путь к файлу SQLite)
+SEARCH_DB_PATH = os.environ.get('SEARCH_DB_PATH', '')
+DEFAULT_LIMIT = 50
+
+# Вес совпадения в заголовке, описании и тексте статьи для BM25
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Запасной стеммер: окончания существительных и прилагательных от длинных к коротким.
+# Глагольных ('ет', 'ат', 'ал'...) нет: они срезали бы основу 'бюджет', 'депутат', 'совет'
+ENDINGS = tuple(sorted((
+    'иями', 'ями', 'ами', 'иях', 'ях', 'ах', 'ием', 'ем', 'ом', 'иям', 'ям', 'ам',
+    'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ых', 'их', 'ый', 'ий', 'ой', 'ей',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ую', 'юю', 'ия', 'ья', 'ию', 'ью', 'ии',
+    'ов', 'ев',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+), key=len, reverse=True))
+REFLEXIVE = ('ся', 'сь')
+MIN_STEM_LENGTH = 3
+# Словарь новостей невелик, а Snowball на чистом Python медленный: основы слов кэшируются
+STEM_CACHE_SIZE = 100000
+
+_snowball = None
+
+
+def _russian_stemmer():
+    """Стеммер Snowball для русского или False, если snowballstemmer не установлен (загружается при первом вызове)"""
+    global _snowball
+    if _snowball is None:
+        try:
+            import snowballstemmer
+            _snowball = snowballstemmer.stemmer('russian')
+        except ImportError:
+            _snowball = False
+    return _snowball
+
+
+@functools.lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word: str) -> str:
+    """Основа слова: Snowball (окончания ищутся в области RV, сначала именные), иначе запасной стеммер"""
+    word = word.lower().replace('ё', 'е')
+    if word.isdigit() or not 'а' <= word[-1] <= 'я':
+        return word
+    stemmer = _russian_stemmer()
+    if stemmer:
+        return stemmer.stemWord(word)
+    return _light_stem(word)
+
+
+def _light_stem(word: str) -> str:
+    """Запасной стеммер: отсекается возвратная частица и одно именное окончание"""
+    for suffix in REFLEXIVE:
+        if word.endswith(suffix) and len(word) - len(suffix) > MIN_STEM_LENGTH:
+            word = word[:-len(suffix)]
+            break
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+    return word
+
+
+def normalize(text: str) -> str:
+    """Текст -> строка основ через пробел (то, что попадает в индекс FTS5)"""
+    return ' '.join(stem(token) for token in TOKEN_PATTERN.findall(text or ''))
+
+
+def match_query(query: str) -> str:
+    """Запрос пользователя -> выражение MATCH: все основы должны встретиться (кавычки экранируют синтаксис FTS5)"""
+    return ' '.join(f'"{term}"' for term in dict.fromkeys(normalize(query).split()))
+
+
+class NewsSearchIndex:
+    """
+    Поисковый индекс: таблица docs с полями новости и её нормализованным текстом
+    и FTS5-индекс над ней (external content: текст хранится один раз, в docs).
+    Ключ документа - каноническая ссылка (news_store.item_key), поэтому новость из ленты
+    и текст той же статьи попадают в один документ.
+    Одна новость может прийти в нескольких категориях: все они хранятся в doc_categories,
+    и фильтр по категории смотрит только туда. docs.category - категория, в которой новость
+    пришла первой: она показывается в результатах поиска без фильтра.
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_key INTEGER PRIMARY KEY,
+                link TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                category TEXT NOT NULL,
+                source TEXT NOT NULL,
+                date TEXT NOT NULL,
+                time TEXT NOT NULL,
+                image TEXT NOT NULL,
+                published_at INTEGER NOT NULL,
+                title_terms TEXT NOT NULL,
+                description_terms TEXT NOT NULL,
+                body_terms TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS doc_categories (
+                doc_key INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                PRIMARY KEY (category, doc_key)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                title_terms, description_terms, body_terms,
+                content='docs', content_rowid='doc_key', tokenize='unicode61', detail='column'
+            )
+        ''')
+        self._conn.execute(
+            "INSERT INTO docs_fts (docs_fts, rank) VALUES ('rank', ?)",
+            (f'bm25({TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {BODY_WEIGHT})',)
+        )
+        self._conn.commit()
+        self._counters = {'indexed': 0, 'articles': 0, 'skipped': 0, 'queries': 0}
+
+    # ===== ИНДЕКСАЦИЯ =====
+
+    def _terms(self, doc_key: int):
+        return self._conn.execute(
+            'SELECT title, title_terms, description_terms, body_terms FROM docs WHERE doc_key = ?', (doc_key,)
+        ).fetchone()
+
+    def _reindex(self, doc_key: int, old_terms, new_terms):
+        """Заменяет документ в FTS5: для external content старые термы удаляются командой 'delete'"""
+        if old_terms is not None:
+            self._conn.execute(
+                "INSERT INTO docs_fts (docs_fts, rowid, title_terms, description_terms, body_terms) "
+                "VALUES ('delete', ?, ?, ?, ?)",
+                (doc_key, *old_terms)
+            )
+        self._conn.execute(
+            'INSERT INTO docs_fts (rowid, title_terms, description_terms, body_terms) VALUES (?, ?, ?, ?)',
+            (doc_key, *new_terms)
+        )
+
+    def ingest(self, category: str, items: Iterable) -> int:
+        """Индексирует новости категории, которых ещё нет в индексе. Возвращает число добавленных"""
+        added = 0
+        with self._lock:
+            for item in items:
+                doc_key = item_key(item)
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO doc_categories (doc_key, category) VALUES (?, ?)', (doc_key, category)
+                )
+                row = self._terms(doc_key)
+                if row is not None and row[0]:
+                    self._counters['skipped'] += 1
+                    continue
+
+                title = item.get('title') or ''
+                description = item.get('description') or ''
+                new_terms = (normalize(title), normalize(description), row[3] if row else '')
+                fields = (
+                    item.get('link') or '', title, description, category, item.get('source') or '',
+                    item.get('date') or '', item.get('time') or '', item.get('image') or '',
+                    item.get('published_at') or parse_timestamp(item.get('date', ''), item.get('time', '')),
+                )
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO docs (doc_key, link, title, description, category, source, date, time, '
+                    'image, published_at, title_terms, description_terms, body_terms) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (doc_key, *fields, *new_terms)
+                )
+                self._reindex(doc_key, row[1:] if row else None, new_terms)
+                added += 1
+            self._conn.commit()
+            self._counters['indexed'] += added
+        return added
+
+    def index_article(self, url: str, text: str):
+        """Добавляет (или обновляет, если он изменился) текст статьи"""
+        body_terms = normalize(text)
+        doc_key = item_key({'link': url})
+        with self._lock:
+            row = self._terms(doc_key)
+            if row is not None and row[3] == body_terms:
+                return
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO docs (doc_key, link, title, description, category, source, date, time, image, "
+                    "published_at, title_terms, description_terms, body_terms) "
+                    "VALUES (?, ?, '', '', '', '', '', '', '', 0, '', '', ?)",
+                    (doc_key, url, body_terms)
+                )
+                new_terms = ('', '', body_terms)
+            else:
+                self._conn.execute('UPDATE docs SET body_terms = ? WHERE doc_key = ?', (body_terms, doc_key))
+                new_terms = (row[1], row[2], body_terms)
+            self._reindex(doc_key, row[1:] if row else None, new_terms)
+            self._conn.commit()
+            self._counters['articles'] += 1
+
+    def on_article(self, url: str, variant: str, text: str):
+        """Подписчик ArticleCache: в индекс идут полные тексты, превью пропускаются"""
+        if variant.startswith('text'):
+            self.index_article(url, text)
+
+    # ===== ПОИСК =====
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> List[NewsItem]:
+        """
+        Новости по запросу, от самых релевантных (BM25). Пустой запрос - пустой результат.
+        С category у найденных новостей проставлена эта категория, иначе - первая, в которой новость пришла
+        """
+        expression = match_query(query)
+        if not expression:
+            return []
+        sql = (
+            'SELECT docs.title, docs.date, docs.time, docs.image, docs.link, docs.source, docs.description, '
+            'docs.category, docs.published_at FROM docs_fts JOIN docs ON docs.doc_key = docs_fts.rowid '
+            'WHERE docs_fts MATCH ?'
+        )
+        params = [expression]
+        if category:
+            sql += (' AND EXISTS (SELECT 1 FROM doc_categories '
+                    'WHERE doc_categories.category = ? AND doc_categories.doc_key = docs.doc_key)')
+            params.append(category)
+        sql += ' ORDER BY docs_fts.rank LIMIT ?'
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._counters['queries'] += 1
+
+        results = []
+        for title, date, time_, image, link, source, description, category_, published_at in rows:
+            item = NewsItem(title=title or link, date=date, time=time_, image=image, link=link,
+                            source=source, category=category or category_, published_at=published_at)
+            if description:
+                item['description'] = description
+            results.append(item)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['documents'] = self._conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Общий индекс приложения: в памяти процесса или в файле SEARCH_DB_PATH
+default_search_index = NewsSearchIndex(SEARCH_DB_PATH or ':memory:')
@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from news_item import NewsItem
+from timeline import parse_timestamp
+from url_canon import url_key
+
+
+# Хранилище новостей включается переменной NEWS_DB_PATH (путь к файлу SQLite)
+NEWS_DB_PATH = os.environ.get('NEWS_DB_PATH', '')
+DEFAULT_PAGE_SIZE = 25
+
+# Порядок колонок в таблице и в SELECT
+STORED_FIELDS = ('title', 'date', 'time', 'image', 'link', 'source', 'description')
+
+
+def _signed(key: int) -> int:
+    """64-битный беззнаковый ключ -> знаковый INTEGER SQLite"""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def item_key(item) -> int:
+    """Ключ новости: каноническая ссылка, а без ссылки - заголовок"""
+    link = item.get('link') or ''
+    return _signed(url_key(link) if link else url_key('title:' + item.get('title', '')))
+
+
+class NewsStore:
+    """
+    История новостей в SQLite.
+    Таблица WITHOUT ROWID с первичным ключом (category, published_at, link_key): новости категории
+    лежат в B-дереве уже по времени, и «последние N» - это чтение подряд одного диапазона ключа,
+    без сортировки и без обращения к отдельной таблице.
+    Уникальный индекс (link_key, category) отсекает уже виденные новости при вставке
+    и ищет новость по ссылке; индекс (source, published_at) - выборка по источнику.
+    Один файл можно использовать из нескольких процессов (gunicorn-воркеров).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS news (
+                category TEXT NOT NULL,
+                published_at INTEGER NOT NULL,
+                link_key INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                date TEXT NOT NULL,
+                time TEXT NOT NULL,
+                image TEXT NOT NULL,
+                link TEXT NOT NULL,
+                source TEXT NOT NULL,
+                description TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (category, published_at, link_key)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS news_link ON news (link_key, category)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS news_source ON news (source, published_at)')
+        self._conn.commit()
+        self._counters = {'ingested': 0, 'inserted': 0, 'skipped': 0, 'reads': 0}
+
+    # ===== ЗАПИСЬ =====
+
+    def ingest(self, category: str, items: Iterable) -> int:
+        """
+        Добавляет новые новости категории, уже известные (по канонической ссылке) пропускаются.
+        Время публикации берётся из published_at, иначе из даты и времени, иначе - момент добавления.
+        Возвращает число добавленных
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            published_at = item.get('published_at') or parse_timestamp(item.get('date', ''), item.get('time', ''))
+            rows.append((
+                category, published_at or int(now), item_key(item),
+                *(item.get(name) or '' for name in STORED_FIELDS), now,
+            ))
+        if not rows:
+            return 0
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO news (category, published_at, link_key, '
+                f'{", ".join(STORED_FIELDS)}, first_seen) VALUES ({", ".join("?" * (len(STORED_FIELDS) + 4))})',
+                rows
+            )
+            self._conn.commit()
+            inserted = self._conn.total_changes - before
+            self._counters['ingested'] += len(rows)
+            self._counters['inserted'] += inserted
+            self._counters['skipped'] += len(rows) - inserted
+        return inserted
+
+    # ===== ЧТЕНИЕ =====
+
+    def _items(self, query: str, params) -> List[NewsItem]:
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            rows = cursor.fetchall()
+            self._counters['reads'] += 1
+        items = []
+        for row in rows:
+            item = NewsItem(**dict(zip(('category', 'published_at') + STORED_FIELDS, row)))
+            if not item.description:
+                del item['description']
+            items.append(item)
+        return items
+
+    def latest(self, category: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> List[NewsItem]:
+        """Последние новости категории (страница offset // limit) - диапазон первичного ключа"""
+        return self._items(
+            f'SELECT category, published_at, {", ".join(STORED_FIELDS)} FROM news '
+            'WHERE category = ? ORDER BY published_at DESC, link_key DESC LIMIT ? OFFSET ?',
+            (category, limit, offset)
+        )
+
+    def before(self, category: str, published_at: int, limit: int = DEFAULT_PAGE_SIZE) -> List[NewsItem]:
+        """Новости категории старше published_at - следующая страница ленты без OFFSET"""
+        return self._items(
+            f'SELECT category, published_at, {", ".join(STORED_FIELDS)} FROM news '
+            'WHERE category = ? AND published_at < ? ORDER BY published_at DESC, link_key DESC LIMIT ?',
+            (category, published_at, limit)
+        )
+
+    def by_source(self, source: str, limit: int = DEFAULT_PAGE_SIZE) -> List[NewsItem]:
+        return self._items(
+            f'SELECT category, published_at, {", ".join(STORED_FIELDS)} FROM news '
+            'WHERE source = ? ORDER BY published_at DESC LIMIT ?',
+            (source, limit)
+        )
+
+    def find_link(self, link: str) -> List[NewsItem]:
+        """Новость по ссылке в любом написании (во всех категориях, где она встречалась)"""
+        return self._items(
+            f'SELECT category, published_at, {", ".join(STORED_FIELDS)} FROM news WHERE link_key = ?',
+            (item_key({'link': link}),)
+        )
+
+    def count(self, category: Optional[str] = None) -> int:
+        with self._lock:
+            if category is None:
+                return self._conn.execute('SELECT COUNT(*) FROM news').fetchone()[0]
+            return self._conn.execute('SELECT COUNT(*) FROM news WHERE category = ?', (category,)).fetchone()[0]
+
+    def explain(self, category: str, limit: int = DEFAULT_PAGE_SIZE) -> List[str]:
+        """План запроса latest - для проверки, что он идёт по первичному ключу без сортировки"""
+        with self._lock:
+            rows = self._conn.execute(
+                f'EXPLAIN QUERY PLAN SELECT category, published_at, {", ".join(STORED_FIELDS)} FROM news '
+                'WHERE category = ? ORDER BY published_at DESC, link_key DESC LIMIT ?',
+                (category, limit)
+            ).fetchall()
+        return [row[-1] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['rows'] = self._conn.execute('SELECT COUNT(*) FROM news').fetchone()[0]
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def default_news_store() -> Optional[NewsStore]:
+    """Хранилище из переменных окружения или None, если оно не включено"""
+    if not NEWS_DB_PATH:
+        return None
+    return NewsStore(NEWS_DB_PATH)
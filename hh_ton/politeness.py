@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from url_canon import canonical_host
+
+
+# По умолчанию: не чаще одного запроса в 2 секунды на хост, всплеск до 2 запросов
+DEFAULT_HOST_RATE = 0.5
+DEFAULT_HOST_BURST = 2
+
+# Пакетная загрузка статей (batch_fetch) уже ограничена per_host одновременными запросами к хосту,
+# поэтому её token bucket мягче: 25 статей РИА - за секунды, а не за 48 с при 0.5 запроса в секунду
+BATCH_HOST_RATE = 4
+BATCH_HOST_BURST = 4
+
+
+class TokenBucket:
+    """
+    Классический token bucket: rate токенов в секунду, не больше capacity в запасе
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self) -> float:
+        """Берёт токен, если он есть. Возвращает 0 при успехе или сколько секунд ждать"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Блокирует до получения токена, возвращает суммарное время ожидания"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class HostRateLimiter:
+    """
+    Вежливость по хостам: у каждого хоста свой TokenBucket,
+    поэтому запросы к разным сайтам не ждут друг друга
+    """
+
+    def __init__(self, rate: float = DEFAULT_HOST_RATE, burst: float = DEFAULT_HOST_BURST,
+                 host_rates: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return canonical_host(url)
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        return self.bucket(url).acquire()
@@ -0,0 +1,147 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import requests
+
+
+# Сколько URL помним максимум (старые вытесняются по LRU)
+DEFAULT_MAX_ENTRIES = 2000
+
+
+class RevalidationStore:
+    """
+    Условные HTTP-запросы (ETag / Last-Modified).
+    Для каждого URL храним валидаторы и уже извлечённый результат:
+    на ответ 304 отдаём прошлый результат без скачивания и повторного парсинга.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'requests': 0,
+            'conditional_requests': 0,
+            'not_modified': 0,
+            'hits': 0,
+            'full_responses': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0,
+        }
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def _get_entry(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put_entry(self, key: Hashable, entry: Dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def conditional_headers(self, key: Hashable) -> Dict[str, str]:
+        """Заголовки If-None-Match / If-Modified-Since для ключа, если валидаторы известны"""
+        entry = self._get_entry(key)
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def fetch(self, url: str, extract: Callable[[requests.Response], Any],
+              get: Callable = requests.get, key: Optional[Hashable] = None, **kwargs) -> Any:
+        """
+        Делает условный GET и возвращает extract(response).
+        На 304 extract не вызывается - возвращается копия прошлого результата.
+        key - ключ результата, если один URL разбирается разными способами (по умолчанию сам URL)
+        """
+        key = url if key is None else key
+        entry = self._get_entry(key)
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(key))
+
+        self._count('requests')
+        if entry:
+            self._count('conditional_requests')
+
+        response = get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            # При stream=True непрочитанный ответ держит соединение пула - возвращаем его
+            response.close()
+            self._count('not_modified')
+            self._count('hits')
+            self._count('bytes_saved', entry['size'])
+            print(f"♻️ 304 Not Modified: {url}")
+            return copy.deepcopy(entry['result'])
+        if response.status_code == 304:
+            self._count('not_modified')
+
+        self._count('full_responses')
+
+        # При stream=True extract может дочитать тело не до конца - считаем реально прочитанное
+        bytes_read = _count_streamed_bytes(response) if kwargs.get('stream') else None
+        try:
+            result = extract(response)
+        finally:
+            # extract не обязан закрывать ответ (и может упасть до этого)
+            if bytes_read is not None:
+                response.close()
+
+        if bytes_read is not None:
+            size = bytes_read[0]
+        else:
+            size = len(response.content or b'')
+        self._count('bytes_downloaded', size)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified):
+            self._put_entry(key, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'result': copy.deepcopy(result),
+            })
+
+        return result
+
+    def forget(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['tracked_urls'] = len(self._entries)
+        return stats
+
+
+def _count_streamed_bytes(response: requests.Response) -> List[int]:
+    """Подменяет response.iter_content счётчиком: в [0] - сколько байт тела отдано extract"""
+    counter = [0]
+    iter_content = response.iter_content
+
+    def counting_iter_content(*args, **kwargs):
+        for chunk in iter_content(*args, **kwargs):
+            counter[0] += len(chunk)
+            yield chunk
+
+    response.iter_content = counting_iter_content
+    return counter
+
+
+# Общее хранилище для всех парсеров: счётчики видны в одном месте
+default_store = RevalidationStore()
@@ -0,0 +1,80 @@
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+
+# Граница цикла задаёт start_cycle() (NewsRefresher вызывает его перед каждым проходом);
+# TTL - только страховка, если start_cycle никто не вызывает, поэтому он длиннее любого прохода
+DEFAULT_CYCLE_TTL = 900
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """
+    Общая загрузка по ключу (URL):
+    - одновременные вызовы с одним ключом ждут единственный запрос и получают его результат;
+    - в пределах цикла обновления (ttl секунд или до start_cycle()) результат переиспользуется.
+    Каждый вызывающий получает свою копию результата.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CYCLE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results = {}
+        self._inflight = {}
+        self._counters = {'fetches': 0, 'shared_waits': 0, 'cycle_hits': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                self._counters['cycle_hits'] += 1
+                return copy.deepcopy(cached[1])
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self._counters['fetches'] += 1
+            else:
+                self._counters['shared_waits'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        else:
+            with self._lock:
+                self._results[key] = (time.monotonic(), call.result)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+        return copy.deepcopy(call.result)
+
+    def start_cycle(self):
+        """Новый цикл обновления: всё, что скачано раньше, будет загружено заново"""
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['cached_keys'] = len(self._results)
+        return stats
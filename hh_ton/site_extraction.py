@@ -0,0 +1,520 @@
+"""
+Декларативное извлечение новостей из страниц-списков.
+
+Источник описывается словарём (см. site_specs.py):
+
+    {
+        'items': ['.news-line__item', 'article'],   # селекторы карточек, по приоритету
+        'item': 'div.card',                         # карточка - первый такой элемент внутри найденного по items
+        'strategy': 'first',                        # 'first' - до первого сработавшего, 'union' - все сразу
+        'min_items': 1,                             # сколько новостей нужно, чтобы не пробовать следующий селектор
+        'limit': 20,                                # сколько карточек брать с одного селектора
+        'unique': 'link',                           # отбрасывать повторы по полю (ссылки - в каноническом виде)
+        'base_url': 'https://tass.ru',              # для нормализации ссылок ('page' - относительно страницы)
+        'fields': {                                 # поля новости (NewsItem) в порядке вывода
+            'title': {'css': 'h2, h3, a', 'min_len': 5, 'truncate': 100},
+            'date': {'value': today},
+            'link': {'css': 'a[href]', 'attr': 'href', 'url': True},
+            ...
+        },
+    }
+
+Ключи поля:
+    value    - константа или функция без аргументов (элемент не ищется);
+    css      - селектор внутри карточки (через запятую - первый по порядку документа),
+               список - варианты по приоритету, None - сама карточка;
+    attr     - атрибут или список атрибутов (первый непустой), иначе текст элемента;
+    text     - 'strip' (текст целиком, обрезанный) или 'parts' (каждый кусок обрезан и склеен);
+    all      - список текстов всех найденных элементов;
+    parse    - функция над найденным значением;
+    into     - parse возвращает кортеж, который раскладывается в несколько полей;
+    fallback - ещё одно описание поля, если это ничего не дало;
+    url      - нормализовать ссылку по base_url;
+    contains - значение обязано содержать подстроку;
+    required - без непустого значения карточка пропускается (по умолчанию, если нет default);
+    allow_empty - карточку пропускает только отсутствие элемента, а найденный элемент
+               с пустым значением даёт default (как select_one(...) без проверки текста);
+    default  - значение (или функция), если ничего не найдено;
+    min_len, max_len, truncate - ограничения длины текста.
+
+Селекторы один раз переводятся в XPath и компилируются (etree.XPath),
+поэтому каждый разбор страницы - это только вычисление готовых выражений над деревом lxml.
+"""
+import re
+from typing import Callable, Dict, List, Optional
+
+from lxml import etree
+
+from news_item import NewsItem
+from url_canon import absolute_url, url_key
+
+
+# ===== CSS -> XPATH =====
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s*>\s*|\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \.(?P<cls>[\w-]+)
+  | \#(?P<id>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[*^$]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+''', re.VERBOSE)
+
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return 'concat(' + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ')'
+
+
+def _attr_condition(name: str, op: Optional[str], value: Optional[str]) -> str:
+    if op is None:
+        return f'@{name}'
+    literal = _xpath_literal(value)
+    if op == '=':
+        return f'@{name}={literal}'
+    if op == '*=':
+        return f'contains(@{name}, {literal})'
+    if op == '^=':
+        return f'starts-with(@{name}, {literal})'
+    # $= : в XPath 1.0 нет ends-with
+    return f'substring(@{name}, string-length(@{name}) - {len(value) - 1})={literal}'
+
+
+def _complex_to_xpath(selector: str) -> str:
+    """
+    Один селектор без запятых -> XPath относительно текущего элемента.
+    Как у select(): ищется последний составной селектор среди потомков, а предки из остальных
+    проверяются условиями ancestor:: / parent:: и могут лежать выше текущего элемента
+    ('h2.tm-title a' от самого h2 находит ссылку)
+    """
+    steps = []
+    combinators = []
+    tag = '*'
+    conditions = []
+    position = 0
+    selector = selector.strip()
+
+    def close_step():
+        steps.append(tag + ''.join(f'[{c}]' for c in conditions))
+
+    while position < len(selector):
+        match = _TOKEN_RE.match(selector, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Неподдерживаемый CSS селектор: {selector!r}")
+        position = match.end()
+
+        if match.group('ws') is not None:
+            close_step()
+            combinators.append('parent::' if '>' in match.group('ws') else 'ancestor::')
+            tag, conditions = '*', []
+        elif match.group('tag'):
+            tag = match.group('tag')
+        elif match.group('cls'):
+            conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')")
+        elif match.group('id'):
+            conditions.append(f"@id={_xpath_literal(match.group('id'))}")
+        else:
+            value = next((v for v in (match.group('dq'), match.group('sq'), match.group('bare')) if v is not None), None)
+            conditions.append(_attr_condition(match.group('attr'), match.group('op'), value))
+
+    close_step()
+    xpath = steps[0]
+    for axis, step in zip(combinators, steps[1:]):
+        xpath = f'{step}[{axis}{xpath}]'
+    return './/' + xpath
+
+
+def css_to_xpath(selector: str) -> str:
+    """
+    CSS селектор (теги, .класс, #id, [атрибуты], потомки и '>') -> XPath.
+    Список через запятую превращается в объединение: результат в порядке документа, как у select()
+    """
+    return ' | '.join(_complex_to_xpath(part) for part in selector.split(','))
+
+
+def compile_css(selector: str) -> etree.XPath:
+    return etree.XPath(css_to_xpath(selector))
+
+
+# ===== ЗНАЧЕНИЯ ЭЛЕМЕНТОВ =====
+
+def element_text(element, mode: str = 'strip') -> str:
+    """Аналог BeautifulSoup get_text().strip() ('strip') и get_text(strip=True) ('parts')"""
+    if mode == 'parts':
+        return ''.join(part.strip() for part in element.itertext())
+    return ''.join(element.itertext()).strip()
+
+
+# ===== КОМПИЛЯЦИЯ =====
+
+class CompiledField:
+    """Поле новости: готовые XPath-выражения и правила обработки значения"""
+
+    def __init__(self, site: str, name: str, spec: Dict, base_url: str = ''):
+        self.site = site
+        self.name = name
+        self.base_url = base_url
+        self.constant = 'value' in spec
+        self.value = spec.get('value')
+
+        css = spec.get('css')
+        self.candidates = css if isinstance(css, list) else [css]
+        self.paths = {selector: compile_css(selector) for selector in self.candidates if selector}
+
+        attr = spec.get('attr')
+        self.attrs = [attr] if isinstance(attr, str) else attr
+        self.text_mode = spec.get('text', 'strip')
+        self.all = spec.get('all', False)
+        self.parse = spec.get('parse')
+        self.into = spec.get('into') or (name,)
+        unknown = set(self.into) - NewsItem.FIELDS
+        if unknown:
+            raise ValueError(f"{site}: поля {sorted(unknown)} нет в NewsItem")
+        self.fallback = CompiledField(site, name, spec['fallback'], base_url) if spec.get('fallback') else None
+        self.normalize = spec.get('url', False)
+        self.contains = spec.get('contains')
+        self.has_default = 'default' in spec
+        self.default = spec.get('default', '')
+        self.required = spec.get('required', not self.has_default and not self.constant)
+        self.allow_empty = spec.get('allow_empty', False)
+        self.min_len = spec.get('min_len')
+        self.max_len = spec.get('max_len')
+        self.truncate = spec.get('truncate')
+
+    def _elements(self, item, selector):
+        if not selector:
+            return [item]
+        return self.paths[selector](item)
+
+    def _element_value(self, element):
+        if self.attrs is None:
+            return element_text(element, self.text_mode)
+        for attr in self.attrs:
+            value = element.get(attr)
+            if value:
+                return value
+        return ''
+
+    def _raw(self, item, memo):
+        """
+        Значение по первому сработавшему варианту селектора.
+        None - элемент не найден; '' с allow_empty - найден, но значение пустое
+        """
+        candidates = self.candidates
+        if len(candidates) > 1:
+            candidates = memo.ordered((self.site, self.name), candidates)
+
+        found_empty = False
+        for selector in candidates:
+            elements = self._elements(item, selector)
+            if not elements:
+                continue
+            if self.all:
+                value = [self._element_value(element) for element in elements]
+            elif self.attrs is None:
+                # Текст берём у первого найденного элемента, даже если он пустой
+                value = self._element_value(elements[0])
+            else:
+                value = self._element_value(elements[0])
+                if not value:
+                    found_empty = True
+                    continue
+            if len(self.candidates) > 1:
+                memo.remember((self.site, self.name), selector)
+            return value
+
+        if self.fallback:
+            value = self.fallback._raw(item, memo)
+            if value and self.fallback.parse:
+                value = self.fallback.parse(value)
+            if value:
+                return value
+        return '' if found_empty and self.allow_empty else None
+
+    def extract(self, item, page_url: str, memo: 'SelectorMemo') -> Optional[Dict]:
+        """Значения поля ({имя: значение}) или None, если карточку нужно пропустить"""
+        if self.constant:
+            value = self.value() if callable(self.value) else self.value
+            return {self.name: value}
+
+        value = self._raw(item, memo)
+        # С allow_empty карточку пропускает только отсутствие элемента, без него - любое пустое значение
+        missing = value is None or not self.allow_empty
+        if value not in (None, '', []) and self.parse:
+            value = self.parse(value)
+
+        if len(self.into) > 1:
+            if not value:
+                if self.required and missing:
+                    return None
+                value = self.default() if callable(self.default) else self.default
+            return dict(zip(self.into, value))
+
+        if isinstance(value, str) and value:
+            if self.normalize:
+                value = absolute_url(value, self.base_url, page_url)
+            if self.contains and self.contains not in value:
+                value = ''
+            if self.min_len and len(value) < self.min_len or self.max_len and len(value) > self.max_len:
+                value = ''
+            if value and self.truncate and len(value) > self.truncate:
+                value = value[:self.truncate] + "..."
+
+        if value in (None, '', []):
+            if self.required and missing:
+                return None
+            value = self.default() if callable(self.default) else self.default
+        return {self.name: value}
+
+
+class SelectorMemo:
+    """
+    Память о сработавших селекторах: ключ (источник, 'items' | поле) -> селектор.
+    store - внешний словарь (например, общий с остальной памятью парсера),
+    count(kind, hit) - необязательный счётчик попаданий
+    """
+
+    def __init__(self, store: Optional[Dict] = None, count: Optional[Callable] = None):
+        self.store = {} if store is None else store
+        self.count = count
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def ordered(self, key, options: List) -> List:
+        """Сначала то, что сработало в прошлый раз, затем остальные варианты в исходном порядке"""
+        remembered = self.store.get(key)
+        if remembered is None or remembered not in options:
+            return options
+        return [remembered] + [option for option in options if option != remembered]
+
+    def remember(self, key, value, hit: Optional[bool] = None):
+        if self.count:
+            self.count('selector', self.store.get(key) == value if hit is None else hit)
+        self.store[key] = value
+
+
+class CompiledSite:
+    """
+    Источник, скомпилированный из декларативного описания.
+    extract(root, page_url) проходит карточки и собирает новости по полям
+    """
+
+    def __init__(self, name: str, spec: Dict):
+        self.name = name
+        items = spec['items']
+        self.item_selectors = items if isinstance(items, list) else [items]
+        self.item_paths = {selector: compile_css(selector) for selector in self.item_selectors}
+        self.card_path = compile_css(spec['item']) if spec.get('item') else None
+        self.strategy = spec.get('strategy', 'first')
+        self.min_items = spec.get('min_items', 1)
+        self.limit = spec.get('limit')
+        self.unique = spec.get('unique')
+        self.base_url = spec.get('base_url', '')
+        self.fields = [
+            CompiledField(name, field_name, field_spec, self.base_url)
+            for field_name, field_spec in spec['fields'].items()
+        ]
+
+    def _cards(self, wrappers) -> List:
+        """Карточки: сами найденные элементы или первый элемент 'item' внутри каждого (без него - пропуск)"""
+        if self.card_path is None:
+            return wrappers
+        cards = []
+        for wrapper in wrappers:
+            found = self.card_path(wrapper)
+            if found:
+                cards.append(found[0])
+        return cards
+
+    def _find(self, root, selector: str) -> List:
+        return self._cards(self.item_paths[selector](root))
+
+    def _item(self, element, page_url, memo, values) -> Optional[NewsItem]:
+        news_item = NewsItem()
+        for field in self.fields:
+            if values and field.name in values:
+                news_item[field.name] = values[field.name]
+                continue
+            extracted = field.extract(element, page_url, memo)
+            if extracted is None:
+                return None
+            news_item.update(extracted)
+        return news_item
+
+    def _collect(self, elements, page_url, memo, values, news_items, seen, verbose):
+        for element in elements[:self.limit]:
+            try:
+                news_item = self._item(element, page_url, memo, values)
+            except Exception as e:
+                if verbose:
+                    print(f"⚠️ Ошибка обработки элемента {self.name}: {e}")
+                continue
+            if news_item is None:
+                continue
+            if self.unique:
+                key = news_item.get(self.unique)
+                if self.unique == 'link':
+                    key = url_key(key)
+                if key in seen:
+                    continue
+                seen.add(key)
+            news_items.append(news_item)
+
+    def extract(self, root, page_url: str = '', memo: Optional[SelectorMemo] = None,
+                values: Optional[Dict] = None, verbose: bool = False) -> List[Dict]:
+        """
+        Новости со страницы (root - дерево lxml или любой его элемент).
+        memo - память о сработавших селекторах, values - значения полей, заданные снаружи
+        """
+        memo = memo or SelectorMemo()
+        news_items = []
+        seen = set()
+        memo_key = (self.name, 'items')
+
+        if self.strategy == 'union':
+            self._extract_union(root, page_url, memo, values, news_items, seen, verbose)
+            if verbose:
+                print(f"✅ {self.name}: собрано {len(news_items)} новостей")
+            return news_items
+
+        for selector in memo.ordered(memo_key, self.item_selectors):
+            elements = self._find(root, selector)
+            if not elements:
+                continue
+            if verbose:
+                print(f"✅ {self.name}: найдены элементы по селектору '{selector}': {len(elements)}")
+            self._collect(elements, page_url, memo, values, news_items, seen, verbose)
+            if len(news_items) >= self.min_items:
+                memo.remember(memo_key, selector)
+                break
+
+        return news_items
+
+    def _extract_union(self, root, page_url, memo, values, news_items, seen, verbose):
+        """Карточки со всех селекторов сразу; запоминается набор давших результат"""
+        memo_key = (self.name, 'items')
+        remembered = memo.get(memo_key)
+        if remembered:
+            elements = [element for selector in remembered for element in self._find(root, selector)]
+            if elements:
+                if memo.count:
+                    memo.count('selector', True)
+                self._collect(elements, page_url, memo, values, news_items, seen, verbose)
+                return
+
+        matched = []
+        elements = []
+        for selector in self.item_selectors:
+            found = self._find(root, selector)
+            if found:
+                elements.extend(found)
+                matched.append(selector)
+        if matched:
+            memo.remember(memo_key, tuple(matched))
+        self._collect(elements, page_url, memo, values, news_items, seen, verbose)
+
+
+    # ===== ПОТОКОВЫЙ РАЗБОР =====
+
+    def _leading_selector(self, memo: SelectorMemo) -> str:
+        """Селектор, чьи карточки идут в начале результата при любом продолжении страницы"""
+        memo_key = (self.name, 'items')
+        if self.strategy == 'union':
+            remembered = memo.get(memo_key)
+            return remembered[0] if remembered else self.item_selectors[0]
+        return memo.ordered(memo_key, self.item_selectors)[0]
+
+    def _closed_items(self, root, selector: str, open_elements: List) -> List:
+        """Карточки, закрывающий тег которых уже прочитан (до первой незакрытой)"""
+        closed = []
+        for element in self.item_paths[selector](root):
+            if any(element is open_element for open_element in open_elements):
+                break
+            closed.append(element)
+        # Карточка 'item' лежит внутри элемента items: закрыт он - закрыта и она
+        return self._cards(closed)
+
+    def _settled(self, root, open_elements, limit, page_url, memo, values) -> Optional[List]:
+        """
+        Карточки, новости из которых уже не изменятся при дочитывании страницы.
+        None - читать дальше, False - результат зависит от всей страницы (проверять больше незачем)
+        """
+        selector = self._leading_selector(memo)
+        closed = self._closed_items(root, selector, open_elements)
+        if not closed:
+            return None
+
+        news_items = []
+        scratch = SelectorMemo(dict(memo.store))
+        if self.strategy != 'union' and self.limit and len(closed) >= self.limit:
+            # Все карточки этого селектора, которые возьмёт extract, уже прочитаны
+            self._collect(closed, page_url, scratch, values, news_items, set(), False)
+            return closed[:self.limit] if len(news_items) >= self.min_items else False
+
+        self._collect(closed, page_url, scratch, values, news_items, set(), False)
+        needed = limit if self.strategy == 'union' else max(limit, self.min_items)
+        return closed if len(news_items) >= needed else None
+
+    def extract_stream(self, chunks, page_url: str = '', limit: Optional[int] = None,
+                       memo: Optional[SelectorMemo] = None, values: Optional[Dict] = None,
+                       verbose: bool = False, encoding: Optional[str] = 'utf-8') -> List[Dict]:
+        """
+        Разбор страницы по мере загрузки: куски байтов подаются в HTMLPullParser,
+        и чтение прекращается, как только первые limit новостей уже не могут измениться.
+        Результат совпадает с первыми limit новостями extract() по всей странице;
+        если страница кончилась раньше - это обычный extract() по ней целиком
+        """
+        memo = memo or SelectorMemo()
+        limit = limit or self.limit
+        parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        open_elements = []
+        root = None
+        bytes_read = 0
+        probing = bool(limit)
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            bytes_read += len(chunk)
+            parser.feed(chunk)
+
+            closed_any = False
+            for event, element in parser.read_events():
+                if event == 'start':
+                    if root is None:
+                        root = element.getroottree().getroot()
+                    open_elements.append(element)
+                else:
+                    closed_any = True
+                    while open_elements and open_elements.pop() is not element:
+                        pass
+
+            if not (probing and closed_any and root is not None):
+                continue
+            elements = self._settled(root, open_elements, limit, page_url, memo, values)
+            if elements is False:
+                probing = False
+            elif elements is not None:
+                news_items = []
+                self._collect(elements, page_url, memo, values, news_items, set(), verbose)
+                if self.strategy != 'union':
+                    memo.remember((self.name, 'items'), self._leading_selector(memo))
+                if verbose:
+                    print(f"⏹️ {self.name}: чтение остановлено после {bytes_read / 1024:.0f} КБ, "
+                          f"новостей: {min(len(news_items), limit)}")
+                return news_items[:limit]
+
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            return []
+        news_items = self.extract(root, page_url, memo=memo, values=values, verbose=verbose)
+        return news_items[:limit] if limit else news_items
+
+
+def compile_sites(specs: Dict[str, Dict]) -> Dict[str, CompiledSite]:
+    """Компиляция всех описаний - один раз при импорте"""
+    return {name: CompiledSite(name, spec) for name, spec in specs.items()}
@@ -0,0 +1,318 @@
+"""
+Описания источников для site_extraction: что считать карточкой новости и откуда брать поля.
+Новый источник - это новая запись в SITE_SPECS, без кода разбора.
+Словари компилируются один раз при импорте модуля (SITES).
+"""
+from datetime import datetime
+from typing import List, Tuple
+
+from site_extraction import compile_sites
+
+
+# ===== ОБРАБОТКА ЗНАЧЕНИЙ =====
+
+RU_MONTHS = {
+    'января': '01',
+    'февраля': '02',
+    'марта': '03',
+    'апреля': '04',
+    'мая': '05',
+    'июня': '06',
+    'июля': '07',
+    'августа': '08',
+    'сентября': '09',
+    'октября': '10',
+    'ноября': '11',
+    'декабря': '12',
+}
+
+
+def today() -> str:
+    return datetime.now().strftime("%d.%m.%Y")
+
+
+def today_without_time() -> Tuple[str, str]:
+    return today(), ''
+
+
+def extract_time(time_text: str) -> str:
+    """Извлекает время из текста в формате ЧЧ:ММ"""
+    time_clean = ''
+    colon_found = False
+    digits_after_colon = 0
+
+    for char in time_text:
+        if char == ':':
+            colon_found = True
+            time_clean += char
+        elif char.isdigit():
+            if colon_found:
+                digits_after_colon += 1
+                if digits_after_colon <= 2:
+                    time_clean += char
+                else:
+                    break
+            else:
+                time_clean += char
+        else:
+            break
+
+    return time_clean
+
+
+def split_date_time(text: str) -> Tuple[str, str]:
+    """'15.10.2025, 12:00' -> ('15.10.2025', '12:00')"""
+    if ',' in text:
+        date, time = map(str.strip, text.split(',', 1))
+        return date, time
+    return text, ''
+
+
+def ria_date_time(text: str) -> Tuple[str, str]:
+    """Дата РИА: '15 октября, 12:30', просто '12:30' (сегодня) или только дата"""
+    date, time = '', ''
+
+    if ',' in text:
+        date_part, time_part = text.split(',', 1)
+        date = date_part.strip()
+        time = extract_time(time_part.strip())
+    elif ':' in text:
+        time = extract_time(text)
+        date = 'Сегодня' if time else ''
+    else:
+        date = text
+
+    if time and not date:
+        date = 'Сегодня'
+
+    return date or today(), time
+
+
+def habr_date_time(text: str) -> Tuple[str, str]:
+    """Habr: '2025-10-01, 07:13' (атрибут title) или ISO '2025-10-01T07:13:26.000Z' (datetime)"""
+    if ',' in text:
+        date, time = text.split(',', 1)
+        return date.strip(), time.strip()
+    if 'T' in text and 'Z' in text:
+        parts = text.replace('Z', '').split('T', 1)
+        if len(parts) == 2:
+            return parts[0], parts[1][:5]
+        return '', ''
+    return text, ''
+
+
+def ru_date(parts: List[str]) -> str:
+    """['5', 'октября', '2025'] -> '05.10.2025'"""
+    if len(parts) < 3:
+        return ''
+    day, month_ru, year = parts[0], parts[1].lower(), parts[2]
+    return f'{day.zfill(2)}.{RU_MONTHS.get(month_ru, "01")}.{year}'
+
+
+def css_background_url(style: str) -> str:
+    """URL из style="background-image: url('...')" """
+    start = style.find('url(')
+    end = style.find(')', start + 4)
+    if start == -1 or end == -1:
+        return ''
+    return style[start + 4:end].strip().strip('"').strip("'")
+
+
+def background_image_url(style: str) -> str:
+    """URL картинки, только если в style задан background-image"""
+    return css_background_url(style) if 'background-image' in style else ''
+
+
+# ===== ИСТОЧНИКИ =====
+
+# Поля карточки sport.ru одинаковы для главной и ленты.
+# Все элементы обязаны быть в карточке, но могут быть пустыми (например, <img src=""> у ленивых картинок)
+SPORT_FIELDS = {
+    'title': {'css': 'h3 a', 'allow_empty': True, 'required': True},
+    'date': {'css': 'span.date', 'parse': split_date_time, 'into': ('date', 'time'),
+             'allow_empty': True, 'required': True, 'default': ('', '')},
+    'image': {'css': 'div.articles-item-image a img', 'attr': 'src',
+              'allow_empty': True, 'required': True, 'default': ''},
+    'link': {'css': 'div.articles-item-image a', 'attr': 'href',
+             'allow_empty': True, 'required': True, 'default': ''},
+}
+
+# Картинка карточки: src, затем data-src (ленивые картинки)
+IMAGE_ATTRS = ['src', 'data-src']
+
+SITE_SPECS = {
+    # ----- Спорт / образование / IT -----
+    'sport.ru main': {
+        'items': 'div.articles-item.articles-item-large',
+        'fields': SPORT_FIELDS,
+    },
+    'sport.ru': {
+        # В каждой обёртке ленты - только первая карточка
+        'items': 'div.lst-itm',
+        'item': 'div.articles-item.articles-item-large',
+        'fields': SPORT_FIELDS,
+    },
+    'k-obr.spb.ru': {
+        'items': 'div.news__item.card',
+        'fields': {
+            'title': {'css': 'h2.news__title a', 'text': 'parts', 'allow_empty': True, 'required': True},
+            'date': {'css': 'div.news__date .d-inline', 'all': True, 'text': 'parts', 'parse': ru_date},
+            'time': {'value': ''},
+            # Карточка без a.news__link пропускается, картинка - только из background-image
+            'image': {'css': 'a.news__link', 'attr': 'style', 'parse': background_image_url,
+                      'allow_empty': True, 'required': True, 'default': ''},
+            'link': {'css': 'h2.news__title a', 'attr': 'href', 'allow_empty': True, 'required': True, 'default': ''},
+        },
+    },
+    'habr.com': {
+        'items': 'article.tm-articles-list__item, article.tm-articles-listitem',
+        'base_url': 'https://habr.com',
+        'fields': {
+            'title': {
+                'css': [
+                    'h2.tm-title a.tm-title__link, h2.tm-title a.tm-titlelink',
+                    # Альтернативная разметка карточки
+                    'a[data-test-id="article-snippet-title-link"]',
+                ],
+                'text': 'parts', 'allow_empty': True, 'required': True,
+            },
+            # Время берём из атрибута title или datetime; карточка без них остаётся с пустой датой
+            'date': {
+                'css': 'a.tm-article-datetime-published time, time.tm-article-datetime-published',
+                'attr': ['title', 'datetime'], 'parse': habr_date_time, 'into': ('date', 'time'),
+                'allow_empty': True, 'required': True, 'default': ('', ''),
+            },
+            'image': {'css': 'img.tm-article-snippet__lead-image, img.tm-article-snippetlead-image',
+                      'attr': 'src', 'url': True, 'default': ''},
+            'link': {
+                'css': [
+                    'h2.tm-title a.tm-title__link, h2.tm-title a.tm-titlelink',
+                    'a[data-test-id="article-snippet-title-link"]',
+                ],
+                'attr': 'href', 'url': True, 'default': '',
+            },
+        },
+    },
+
+    # ----- Политика / наука / здоровье -----
+    'RIA.ru': {
+        'items': ['.cell-list__item', '.list-item', '.news-item', '[data-type="news"]'],
+        # РИА собирает карточки по всем селекторам сразу
+        'strategy': 'union',
+        'unique': 'link',
+        'base_url': 'https://ria.ru',
+        'fields': {
+            'title': {
+                'css': ['.cell-list__item-title', '.list-item__title', 'h2', 'h3', '.news-item__title', None],
+                'min_len': 10,
+            },
+            'date': {
+                'css': ['.cell-info__date', '[data-type="date"]', '.list-item__info'],
+                'parse': ria_date_time, 'into': ('date', 'time'), 'default': today_without_time,
+            },
+            'image': {
+                'css': ['.cell-list__item-img img', 'img'], 'attr': IMAGE_ATTRS,
+                'fallback': {'css': '[style*="background-image"]', 'attr': 'style', 'parse': css_background_url},
+                'url': True, 'default': '',
+            },
+            'link': {'css': [None, 'a[href]'], 'attr': 'href', 'url': True},
+            'source': {'value': 'RIA.ru'},
+        },
+    },
+    'TASS': {
+        'items': [
+            '.news-line__item',
+            '.news-list__item',
+            '.content-big-newslist__item',
+            '.b-material-list__item',
+            'article'
+        ],
+        'limit': 20,
+        'base_url': 'https://tass.ru',
+        'fields': {
+            'title': {'css': '.news-line__title, .news-list__title, .b-material-list__title, h2, h3, h4, a',
+                      'min_len': 5, 'truncate': 100},
+            'date': {'value': today},
+            'time': {'value': ''},
+            'image': {'css': ['img', '.news-line__image img', '.b-material-list__image img', '[data-src]'],
+                      'attr': IMAGE_ATTRS, 'url': True, 'default': ''},
+            'link': {'css': 'a[href]', 'attr': 'href', 'url': True},
+            'source': {'value': 'TASS'},
+        },
+    },
+    'Интерфакс': {
+        'items': [
+            '.newsPage__list .timeline__item',
+            '.newsList .newsItem',
+            '.main-newslist .news-item',
+            '.news-feed-list .news-feed-item',
+            'article',
+            '.news'
+        ],
+        'limit': 20,
+        'min_items': 5,
+        'base_url': 'https://www.interfax.ru',
+        'fields': {
+            'title': {'css': '.timeline__item-title, .newsItem__title, .news-item__title, h3, h4, .title, a',
+                      'min_len': 10, 'max_len': 300, 'truncate': 100},
+            'date': {'value': today},
+            'time': {'value': ''},
+            'image': {'css': ['img', '.timeline__item-img img', '.newsItem__image img', '.news-item__image img',
+                              '[data-src]'],
+                      'attr': IMAGE_ATTRS, 'url': True, 'default': ''},
+            'link': {'css': 'a[href]', 'attr': 'href', 'url': True, 'contains': 'interfax.ru'},
+            'source': {'value': 'Интерфакс'},
+        },
+    },
+    'Доктор Питер': {
+        'items': [
+            '.news-item',
+            '.article-preview',
+            '.news-list-item',
+            '.item-news',
+            'article.news',
+            '.b-news-item'
+        ],
+        'limit': 20,
+        'min_items': 5,
+        'base_url': 'https://doctorpiter.ru',
+        'fields': {
+            'title': {'css': '.news-item__title, .article-preview__title, .news-list-item__title, '
+                             '.item-news__title, h2, h3, h4, .title, a',
+                      'min_len': 10, 'max_len': 300, 'truncate': 100},
+            'date': {'value': today},
+            'time': {'value': ''},
+            'image': {'css': ['img', '.news-item__image img', '.article-preview__image img',
+                              '.news-list-item__image img', '.item-news__image img', '[data-src]'],
+                      'attr': IMAGE_ATTRS, 'url': True, 'default': ''},
+            'link': {'css': 'a[href]', 'attr': 'href', 'url': True, 'contains': 'doctorpiter.ru'},
+            'source': {'value': 'Доктор Питер'},
+        },
+    },
+    # Неизвестные источники: имя источника подставляет вызывающий (values={'source': ...})
+    'generic': {
+        'items': [
+            'article',
+            '.news-item',
+            '.item',
+            '.card',
+            '.post',
+            '[class*="news"]',
+            '[class*="article"]',
+            '.news'
+        ],
+        'limit': 15,
+        'base_url': 'page',
+        'fields': {
+            'title': {'css': 'h1, h2, h3, h4, h5, .title, .heading, [class*="title"], [class*="heading"]',
+                      'min_len': 5, 'max_len': 500, 'truncate': 100},
+            'date': {'value': today},
+            'time': {'value': ''},
+            'image': {'css': 'img', 'attr': 'src', 'default': ''},
+            'link': {'css': 'a[href]', 'attr': 'href', 'url': True},
+            'source': {'value': ''},
+        },
+    },
+}
+
+SITES = compile_sites(SITE_SPECS)
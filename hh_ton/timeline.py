@@ -0,0 +1,105 @@
+"""
+Единое время публикации для новостей из разных источников и общая лента по времени.
+
+Источники отдают дату по-разному: 'ДД.ММ.ГГГГ', ISO 'ГГГГ-ММ-ДД', 'Сегодня',
+'15 октября' (РИА), время 'ЧЧ:ММ' или пустую строку. normalize_items один раз переводит
+дату и время каждой новости в published_at - секунды Unix (0 - дату разобрать не удалось).
+Время на страницах сайтов считается московским.
+
+merge_timeline сливает уже отсортированные списки источников кучей (heapq.merge):
+первые N новостей общей ленты стоят O(N log k) для k источников вместо полной сортировки.
+"""
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+from site_specs import RU_MONTHS
+from url_canon import url_key
+
+
+MOSCOW_TZ = timezone(timedelta(hours=3))
+
+RELATIVE_DAYS = {'сегодня': 0, 'вчера': 1}
+
+
+def _parse_date(text: str, now: datetime) -> Optional[datetime]:
+    text = text.strip().lower()
+    if not text:
+        return None
+    if text in RELATIVE_DAYS:
+        day = now - timedelta(days=RELATIVE_DAYS[text])
+        return day.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    for date_format in ('%d.%m.%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text[:10], date_format).replace(tzinfo=now.tzinfo)
+        except ValueError:
+            pass
+
+    # '15 октября' или '15 октября 2025'
+    parts = text.replace(',', ' ').split()
+    if len(parts) >= 2 and parts[0].isdigit() and parts[1] in RU_MONTHS:
+        year = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else now.year
+        try:
+            date = datetime(year, int(RU_MONTHS[parts[1]]), int(parts[0]), tzinfo=now.tzinfo)
+        except ValueError:
+            return None
+        # Без года: '31 декабря' в январе - это прошлый год
+        if len(parts) == 2 and date > now + timedelta(days=1):
+            date = date.replace(year=year - 1)
+        return date
+    return None
+
+
+def _parse_time(text: str):
+    """'12:30' -> (12, 30); пустая или непонятная строка -> (0, 0)"""
+    hours, _, minutes = text.strip().partition(':')
+    if hours.isdigit() and minutes[:2].isdigit():
+        hours, minutes = int(hours), int(minutes[:2])
+        if hours < 24 and minutes < 60:
+            return hours, minutes
+    return 0, 0
+
+
+def parse_timestamp(date: str, time: str = '', now: Optional[datetime] = None) -> int:
+    """Дата и время новости -> секунды Unix; 0, если дату разобрать не удалось"""
+    now = now or datetime.now(MOSCOW_TZ)
+    day = _parse_date(date or '', now)
+    if day is None:
+        return 0
+    hours, minutes = _parse_time(time or '')
+    return int(day.replace(hour=hours, minute=minutes).timestamp())
+
+
+def normalize_items(items: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Проставляет published_at каждой новости (уже заданное - например, из RSS - не трогает).
+    Возвращает тот же список, отсортированный от новых к старым; при равном времени
+    сохраняется порядок источника
+    """
+    now = now or datetime.now(MOSCOW_TZ)
+    for item in items:
+        if not item.get('published_at'):
+            item['published_at'] = parse_timestamp(item.get('date', ''), item.get('time', ''), now)
+    items.sort(key=published_at, reverse=True)
+    return items
+
+
+def published_at(item: Dict) -> int:
+    return item.get('published_at') or 0
+
+
+def merge_timeline(sources: Iterable[List[Dict]],
+                   dedupe_keys: Callable[[Dict], Iterable[Hashable]] = lambda item: (url_key(item['link']),)
+                   ) -> Iterator[Dict]:
+    """
+    Общая лента от новых к старым из списков, каждый из которых уже отсортирован normalize_items.
+    Новость пропускается, если любой из её ключей dedupe_keys уже встречался
+    """
+    seen = set()
+    for item in heapq.merge(*sources, key=published_at, reverse=True):
+        keys = tuple(dedupe_keys(item))
+        if any(key in seen for key in keys):
+            continue
+        seen.update(keys)
+        yield item
@@ -0,0 +1,111 @@
+"""
+Канонический вид ссылок - один для всех парсеров.
+
+Одна и та же статья приходит как http:// и https://, с www. и без, с '/' на конце и без,
+с якорем и метками рекламных кампаний. canonical_url сводит все варианты к одной строке;
+она служит ключом для отсева повторов и кэшей, а не ссылкой для перехода (её сайт может не открыть).
+SeenUrls хранит не строки, а 64-битные хэши канонических ссылок.
+"""
+import hashlib
+import threading
+from typing import Iterable
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
+
+
+# Параметры, не влияющие на содержимое страницы
+TRACKING_PARAMS = ('utm_', 'yclid', 'gclid', 'fbclid', '_openstat')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def absolute_url(link: str, base_url: str, page_url: str = '') -> str:
+    """Абсолютная ссылка: //host -> https:, /path и относительные пути - от base_url ('page' - от страницы)"""
+    if not link or link.startswith('javascript:'):
+        return ''
+    link = link.strip()
+    if base_url == 'page':
+        return urljoin(page_url, link)
+    if link.startswith('//'):
+        return 'https:' + link
+    if link.startswith('/'):
+        return base_url + link
+    if not link.startswith('http'):
+        return base_url + '/' + link
+    return link
+
+
+def canonical_host(url: str) -> str:
+    """Хост в нижнем регистре без www."""
+    host = urlsplit(url).hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def _tracking(name: str) -> bool:
+    name = name.lower()
+    return name.startswith(TRACKING_PARAMS)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Ключ ссылки: без схемы (http и https совпадают), хост без www. и стандартного порта,
+    путь без '/' на конце, параметры без меток кампаний и в отсортированном порядке, без якоря
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+
+    host = canonical_host(url)
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f'{host}:{port}'
+
+    path = parts.path.rstrip('/')
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _tracking(name)
+    )
+    key = f'//{host}{path}'
+    if query:
+        key += '?' + urlencode(query)
+    return key
+
+
+def url_key(url: str) -> int:
+    """64-битный хэш канонической ссылки - стабильный между процессами"""
+    digest = hashlib.blake2b(canonical_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class SeenUrls:
+    """
+    Множество уже встреченных ссылок по хэшам канонического вида:
+    разные записи одной ссылки считаются одной, а память не зависит от длины URL
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._keys = set()
+        self._lock = threading.Lock()
+        for url in urls:
+            self.add(url)
+
+    def add(self, url: str) -> bool:
+        """True, если ссылка встретилась впервые"""
+        key = url_key(url)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)